@@ -1,277 +1,378 @@
 import streamlit as st
 import random
 import time
-import numpy as np
-import streamlit.components.v1 as components
+from collections import deque
+
+from snake_arena import ArenaHost
+from snake_autopilot import Autopilot
+from snake_engine import BOARD_SIZE, BOARD_SIZES, start_rewind
+from snake_leaderboard import Leaderboard
+from snake_levels import DEFAULT_LEVEL, LEVELS, make_game
+from snake_profiler import RerunProfiler
+from snake_render import CanvasRenderer
+from snake_replay import MAX_SEED, Replay, start_recording
+from snake_server import GameServer
 
 # Game configuration
-BOARD_SIZE = 20
 CELL_SIZE = 25
+MIN_TICK_MS = 50
+DEFAULT_TICK_MS = 500
+REWIND_TICKS = 1000
+REWIND_STEP = 10
+ARENA_BOARD_SIZE = 200
+ARENA_BOTS = 100
 
 # Initialize game state
-def init_game():
-    st.session_state.snake = [(10, 10), (10, 9), (10, 8)]
-    st.session_state.food = generate_food()
-    st.session_state.direction = "RIGHT"
-    st.session_state.score = 0
-    st.session_state.game_over = False
+def init_game(seed=None, board_size=BOARD_SIZE, level=DEFAULT_LEVEL):
+    # Every game gets a seed so it can be saved as a replay
+    st.session_state.chosen_seed = seed
+    st.session_state.level = level
+    if seed is None:
+        seed = random.randrange(2**63)
+    st.session_state.game = make_game(board_size, seed=seed, level=level)
+    start_recording(st.session_state.game)
+    start_rewind(st.session_state.game, REWIND_TICKS)
+    st.session_state.autopilot = Autopilot(board_size)
     st.session_state.game_started = False
-    st.session_state.last_key = None
+    st.session_state.result_saved = False
 
-def generate_food():
-    while True:
-        food = (random.randint(0, BOARD_SIZE-1), random.randint(0, BOARD_SIZE-1))
-        if food not in st.session_state.snake:
-            return food
+def record_tick():
+    """Remember when an auto-play tick ran and return the achieved ticks/sec"""
+    tick_times = st.session_state.tick_times
+    tick_times.append(time.perf_counter())
+    if len(tick_times) < 2:
+        return 0.0
+    return (len(tick_times) - 1) / (tick_times[-1] - tick_times[0])
 
-def move_snake():
-    if st.session_state.game_over:
-        return
-    
-    head = st.session_state.snake[0]
-    
-    # Calculate new head position based on direction
-    if st.session_state.direction == "UP":
-        new_head = (head[0], head[1] - 1)
-    elif st.session_state.direction == "DOWN":
-        new_head = (head[0], head[1] + 1)
-    elif st.session_state.direction == "LEFT":
-        new_head = (head[0] - 1, head[1])
-    elif st.session_state.direction == "RIGHT":
-        new_head = (head[0] + 1, head[1])
-    
-    # Check wall collision
-    if (new_head[0] < 0 or new_head[0] >= BOARD_SIZE or 
-        new_head[1] < 0 or new_head[1] >= BOARD_SIZE):
-        st.session_state.game_over = True
-        return
-    
-    # Check self collision
-    if new_head in st.session_state.snake:
-        st.session_state.game_over = True
-        return
-    
-    # Add new head
-    st.session_state.snake.insert(0, new_head)
+def game_board():
+    """Draw the board; timer-driven reruns of this fragment advance auto-play"""
+    game = st.session_state.game
+    renderer = st.session_state.board_renderer
+    profiler = st.session_state.profiler
+    full_run = st.session_state.board_full_run
+    st.session_state.board_full_run = False
+    if not full_run:
+        profiler.start_run("fragment")
     
-    # Check if food is eaten
-    if new_head == st.session_state.food:
-        st.session_state.score += 10
-        st.session_state.food = generate_food()
+    # Key presses arrive in batches; play them all before drawing
+    with profiler.stage("keys"):
+        inputs = renderer.take_keys()
+        if inputs and not game.game_over:
+            game.apply_inputs(inputs)
+    profiler.record("key_events", len(inputs))
+    if game.game_over and inputs:
+        st.rerun()  # Full rerun to show the game over screen
+
+    if st.session_state.get('auto_play', False) and not game.game_over:
+        # Only timer ticks move the snake, not the full script runs
+        if not full_run:
+            with profiler.stage("move"):
+                if st.session_state.get('use_autopilot', False):
+                    game.turn(st.session_state.autopilot.choose(game))
+                game.step()
+            rate = record_tick()
+            if game.game_over:
+                st.rerun()  # Full rerun to show the game over screen
+        else:
+            rate = 0.0
+        st.caption(f"🎯 Score: {game.score} · 📏 Length: {len(game.snake)} · ⏱️ {rate:.1f} ticks/sec")
     else:
-        # Remove tail if no food eaten
-        st.session_state.snake.pop()
+        st.session_state.tick_times.clear()
 
-def handle_key_input():
-    """Handle keyboard input from JavaScript and update direction"""
-    if not st.session_state.game_started or st.session_state.game_over:
-        return False
-    
-    key = st.session_state.get('last_key', None)
-    if not key:
-        return False
-    
-    moved = False
-    if key == "w" or key == "W":
-        if st.session_state.direction != "DOWN":
-            st.session_state.direction = "UP"
-            moved = True
-    elif key == "s" or key == "S":
-        if st.session_state.direction != "UP":
-            st.session_state.direction = "DOWN"
-            moved = True
-    elif key == "a" or key == "A":
-        if st.session_state.direction != "RIGHT":
-            st.session_state.direction = "LEFT"
-            moved = True
-    elif key == "d" or key == "D":
-        if st.session_state.direction != "LEFT":
-            st.session_state.direction = "RIGHT"
-            moved = True
-    elif key == " ":  # Spacebar for auto move
-        moved = True
+    renderer.render(game, CELL_SIZE, capture_keys=not game.game_over, profiler=profiler)
+    if not full_run:
+        profiler.finish_run()
+
+@st.cache_resource
+def game_server():
+    """One game server per process, shared by every session"""
+    server = GameServer(board_size=BOARD_SIZE, idle_timeout=60)
+    server.start_in_thread()
+    return server
+
+@st.cache_resource
+def arena_host():
+    """One shared-board arena per process; every session's snake plays on it"""
+    host = ArenaHost(board_size=ARENA_BOARD_SIZE, bots=ARENA_BOTS)
+    host.start_in_thread()
+    return host
+
+@st.cache_resource
+def leaderboard():
+    """One leaderboard (and background writer) per process, shared by every session"""
+    return Leaderboard()
+
+def high_score(game):
+    """The player's best score on this board and level, counting a game still being written"""
+    best = leaderboard().personal_best(st.session_state.player_name, game.board_size,
+                                       st.session_state.level)
+    if st.session_state.result_saved:
+        best = max(best, game.score)
+    return best
+
+def server_board():
+    """Board of this session's server game, refreshed on every server tick"""
+    server = game_server()
+    for direction in st.session_state.board_renderer.take_keys("server_board"):
+        if direction is not None:
+            server.send_input(st.session_state.server_game_id, direction)
+    try:
+        view = server.state(st.session_state.server_game_id)
+    except KeyError:
+        # Dropped after being idle; join again
+        st.session_state.server_game_id = server.join()
+        view = server.state(st.session_state.server_game_id)
     
-    if moved:
-        move_snake()
-        st.session_state.last_key = None  # Clear the key after processing
-        return True
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Score", view.score)
+    with col2:
+        st.metric("Length", len(view.snake))
+    with col3:
+        st.metric("Server Tick", view.tick)
     
-    return False
-
-def create_keyboard_listener():
-    """Create JavaScript keyboard event listener"""
-    keyboard_js = """
-    <script>
-    document.addEventListener('keydown', function(event) {
-        // Prevent default behavior for WASD keys and spacebar
-        if(['w', 'W', 'a', 'A', 's', 'S', 'd', 'D', ' '].includes(event.key)) {
-            event.preventDefault();
-        }
-        
-        // Send key to Streamlit
-        if(['w', 'W', 'a', 'A', 's', 'S', 'd', 'D', ' '].includes(event.key)) {
-            // Use query parameter to send key to streamlit
-            const url = new URL(window.location);
-            url.searchParams.set('key', event.key);
-            window.history.replaceState({}, '', url);
-            
-            // Trigger a rerun by dispatching a custom event
-            window.parent.postMessage({
-                type: 'streamlit:setComponentValue',
-                value: event.key
-            }, '*');
-        }
-    });
+    if view.game_over:
+        st.error("🎮 Game Over!")
+    st.session_state.board_renderer.render(view, CELL_SIZE, key="server_board", capture_keys=True)
     
-    // Focus the window to capture keyboard events
-    window.focus();
-    </script>
-    <div style="text-align: center; padding: 20px; background: #f0f0f0; border-radius: 10px; margin: 10px 0;">
-        <h3>🎮 Game Controls Active</h3>
-        <p>Use <strong>WASD Keys</strong> to control the snake!</p>
-        <p><strong>W</strong> (up), <strong>A</strong> (left), <strong>S</strong> (down), <strong>D</strong> (right), or <strong>Spacebar</strong> to move forward</p>
-        <small>Make sure this window is focused to capture key presses</small>
-    </div>
-    """
-    return keyboard_js
-
-def create_board():
-    # Create empty board
-    board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+    stats = server.stats()
+    st.caption(f"🌐 {stats['active_games']} games on this server · {stats['ticks_per_sec']:.1f} ticks/sec · "
+               f"tick cost p99 {stats['tick_ms_p99']:.2f} ms")
+
+def arena_board():
+    """The shared arena board, refreshed on every arena tick"""
+    host = arena_host()
+    for direction in st.session_state.board_renderer.take_keys("arena_board"):
+        if direction is not None:
+            host.send_input(st.session_state.arena_snake_id, direction)
+    try:
+        view = host.view(st.session_state.arena_snake_id)
+    except KeyError:
+        # Dropped after being idle; join again
+        join_arena()
+        view = host.view(st.session_state.arena_snake_id)
     
-    # Add snake
-    for segment in st.session_state.snake:
-        board[segment[1], segment[0]] = 1
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Score", view.score)
+    with col2:
+        st.metric("Length", view.length)
+    with col3:
+        st.metric("Players", view.players)
     
-    # Add snake head (different color)
-    if st.session_state.snake:
-        head = st.session_state.snake[0]
-        board[head[1], head[0]] = 2
+    if view.game_over:
+        st.error("🎮 Game Over! Respawn to play again.")
+    st.session_state.board_renderer.render(view, CELL_SIZE, key="arena_board", capture_keys=True)
+    st.caption(f"🏟️ {ARENA_BOTS} bots and {view.players} players share this board · tick {view.tick}")
+
+def join_arena():
+    """Join the arena as a new snake, or show an error and stop when it is full"""
+    try:
+        st.session_state.arena_snake_id = arena_host().join()
+    except RuntimeError:
+        st.session_state.pop('arena_snake_id', None)
+        st.error("🏟️ The arena is full, try again in a moment.")
+        st.stop()
+
+def play_in_arena():
+    """Play one of many snakes on the shared arena board"""
+    host = arena_host()
+    if 'arena_snake_id' not in st.session_state:
+        join_arena()
+    snake_id = st.session_state.arena_snake_id
     
-    # Add food
-    food = st.session_state.food
-    board[food[1], food[0]] = 3
+    st.fragment(arena_board, run_every=host.tick_interval)()
     
-    return board
+    col1, col2, col3, col4, col5 = st.columns(5)
+    for col, direction, label in [(col1, "LEFT", "⬅️ Left"), (col2, "UP", "⬆️ Up"),
+                                  (col3, "DOWN", "⬇️ Down"), (col4, "RIGHT", "➡️ Right")]:
+        with col:
+            if st.button(label, key=f"arena_{direction}", use_container_width=True):
+                host.send_input(snake_id, direction)
+    with col5:
+        if st.button("🔄 Respawn", key="arena_respawn", use_container_width=True):
+            try:
+                host.restart(snake_id)
+            except KeyError:
+                # Dropped after being idle; join again
+                join_arena()
+            except RuntimeError:
+                st.session_state.pop('arena_snake_id', None)
+                st.error("🏟️ The arena is full, try again in a moment.")
 
-def board_to_html(board):
-    html = '<div style="display: grid; grid-template-columns: repeat(20, 25px); gap: 1px; background-color: #000; padding: 10px; border-radius: 10px; justify-content: center;">'
+def play_on_server():
+    """Play a game hosted by the shared server instead of in this session"""
+    server = game_server()
+    if 'server_game_id' not in st.session_state:
+        st.session_state.server_game_id = server.join()
+    game_id = st.session_state.server_game_id
     
-    for row in board:
-        for cell in row:
-            if cell == 0:  # Empty
-                color = "#333"
-            elif cell == 1:  # Snake body
-                color = "#0f0"
-            elif cell == 2:  # Snake head
-                color = "#090"
-            elif cell == 3:  # Food
-                color = "#f00"
-            
-            html += f'<div style="width: 23px; height: 23px; background-color: {color}; border-radius: 2px;"></div>'
+    st.fragment(server_board, run_every=server.tick_interval)()
     
-    html += '</div>'
-    return html
+    col1, col2, col3, col4, col5 = st.columns(5)
+    for col, direction, label in [(col1, "LEFT", "⬅️ Left"), (col2, "UP", "⬆️ Up"),
+                                  (col3, "DOWN", "⬇️ Down"), (col4, "RIGHT", "➡️ Right")]:
+        with col:
+            if st.button(label, key=f"server_{direction}", use_container_width=True):
+                server.send_input(game_id, direction)
+    with col5:
+        if st.button("🔄 Restart", key="server_restart", use_container_width=True):
+            server.restart(game_id)
 
 # Initialize session state
-if 'snake' not in st.session_state:
+if 'game' not in st.session_state:
     init_game()
+if 'board_renderer' not in st.session_state:
+    st.session_state.board_renderer = CanvasRenderer()
+if 'tick_times' not in st.session_state:
+    st.session_state.tick_times = deque(maxlen=50)
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = RerunProfiler()
 
 # Page configuration
 st.set_page_config(page_title="🐍 Snake Game", layout="centered")
 
+# Profiling (opt-in): time each stage of every rerun
+profiler = st.session_state.profiler
+profiler.enabled = st.sidebar.checkbox("⏱️ Profile reruns", key="profiling",
+                                       help="Time each stage of every rerun and show p50/p95 at the bottom")
+profiler.start_run("full")
+
 # Title
 st.title("🐍 Snake Game")
+st.sidebar.text_input("👤 Player name", value="Player", key="player_name",
+                      help="Scores are saved to the leaderboard under this name")
+
+# Shared server mode: the game runs in the server's tick loop, not in this session
+if st.sidebar.toggle("🌐 Play on the shared game server", key="server_mode"):
+    play_on_server()
+    st.stop()
+elif 'server_game_id' in st.session_state:
+    game_server().leave(st.session_state.pop('server_game_id'))
 
-# Check for keyboard input from URL parameters
-query_params = st.query_params
-if 'key' in query_params:
-    st.session_state.last_key = query_params['key']
-    # Clear the query parameter
-    del st.query_params['key']
+# Arena mode: one snake among many bots and players on a shared board
+if st.sidebar.toggle("🏟️ Arena: share one board with other snakes", key="arena_mode"):
+    play_in_arena()
+    st.stop()
+elif 'arena_snake_id' in st.session_state:
+    arena_host().leave(st.session_state.pop('arena_snake_id'))
 
-# Handle keyboard input
-if handle_key_input():
-    st.rerun()
+game = st.session_state.game
 
 # Game info
+profiler.lap("setup")
 col1, col2, col3 = st.columns(3)
 with col1:
-    st.metric("Score", st.session_state.score)
+    st.metric("Score", game.score)
 with col2:
-    st.metric("Length", len(st.session_state.snake))
+    st.metric("Length", len(game.snake))
 with col3:
-    st.metric("High Score", st.session_state.get('high_score', 0))
+    st.metric("High Score", high_score(game))
 
 # Control buttons
 if not st.session_state.game_started:
+    board_size = st.select_slider("📐 Board size", options=list(BOARD_SIZES),
+                                  value=BOARD_SIZE,
+                                  help="Boards above 100x100 are drawn as one image per move")
+    level = st.selectbox("🧱 Level", LEVELS, format_func=str.capitalize,
+                         help="Walls to steer around; food always spawns where the snake can reach it")
+    seed_text = st.text_input("🎲 Seed (optional)", placeholder="Leave empty for a random game",
+                              help="Games with the same seed and moves play out identically")
     if st.button("🎮 Start Game", use_container_width=True):
+        try:
+            seed = int(seed_text) if seed_text.strip() else None
+        except ValueError:
+            st.error("The seed must be a whole number")
+            st.stop()
+        if seed is not None and not 0 <= seed < MAX_SEED:
+            st.error(f"The seed must be between 0 and {MAX_SEED - 1}")
+            st.stop()
+        init_game(seed, board_size, level)
         st.session_state.game_started = True
         st.rerun()
 
 # Keyboard controls (only show when game is active)
-if st.session_state.game_started and not st.session_state.game_over:
-    # JavaScript keyboard listener
-    keyboard_html = create_keyboard_listener()
-    components.html(keyboard_html, height=150)
+if st.session_state.game_started and not game.game_over:
+    st.info("🎮 **Keyboard controls active:** W (up), A (left), S (down), D (right), "
+            "or Spacebar to move forward. Quick key presses are all played in order.")
 
-if st.session_state.game_started and not st.session_state.game_over:
+if st.session_state.game_started and not game.game_over:
     # Direction controls (backup buttons)
     st.write("**Backup Button Controls:**")
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
         if st.button("⬅️ Left", key="left", use_container_width=True):
-            if st.session_state.direction != "RIGHT":
-                st.session_state.direction = "LEFT"
-                move_snake()
+            if game.turn("LEFT"):
+                game.step()
                 st.rerun()
     
     with col2:
         if st.button("⬆️ Up", key="up", use_container_width=True):
-            if st.session_state.direction != "DOWN":
-                st.session_state.direction = "UP"
-                move_snake()
+            if game.turn("UP"):
+                game.step()
                 st.rerun()
     
     with col3:
         if st.button("⬇️ Down", key="down", use_container_width=True):
-            if st.session_state.direction != "UP":
-                st.session_state.direction = "DOWN"
-                move_snake()
+            if game.turn("DOWN"):
+                game.step()
                 st.rerun()
     
     with col4:
         if st.button("➡️ Right", key="right", use_container_width=True):
-            if st.session_state.direction != "LEFT":
-                st.session_state.direction = "RIGHT"
-                move_snake()
+            if game.turn("RIGHT"):
+                game.step()
                 st.rerun()
     
     with col5:
         if st.button("⏸️ Auto Move", key="auto", use_container_width=True):
-            move_snake()
+            game.step()
             st.rerun()
 
-# Game board
+# Rewind through the last REWIND_TICKS moves, even after a game over
+if st.session_state.game_started and game.history:
+    if st.button(f"⏪ Rewind {REWIND_STEP} moves", key="rewind", use_container_width=True,
+                 help="Only the first ending of a game is saved to the leaderboard"):
+        game.rewind(REWIND_STEP)
+        st.session_state.autopilot = Autopilot(game.board_size)  # Its plan was for later moves
+        st.rerun()
+
+profiler.lap("controls")
+
+# Game board (auto-play ticks rerun only this fragment, without a sleeping script thread)
 if st.session_state.game_started:
-    board = create_board()
-    board_html = board_to_html(board)
-    st.markdown(board_html, unsafe_allow_html=True)
+    auto_play = st.session_state.get('auto_play', False) and not game.game_over
+    tick_seconds = st.session_state.get('tick_ms', DEFAULT_TICK_MS) / 1000
+    st.session_state.board_full_run = True
+    st.fragment(game_board, run_every=tick_seconds if auto_play else None)()
+
+profiler.lap("board")
 
 # Game over screen
-if st.session_state.game_over:
+if game.game_over:
     st.error("🎮 Game Over!")
     
-    # Update high score
-    if st.session_state.score > st.session_state.get('high_score', 0):
-        st.session_state.high_score = st.session_state.score
-        st.success(f"🏆 New High Score: {st.session_state.score}!")
+    # Save the result once; the leaderboard writes it in the background
+    if not st.session_state.result_saved:
+        st.session_state.new_high_score = game.score > high_score(game)
+        leaderboard().submit(st.session_state.player_name, game)
+        st.session_state.result_saved = True
+    if st.session_state.new_high_score:
+        st.success(f"🏆 New High Score: {game.score}!")
+    
+    st.download_button(
+        "💾 Download Replay",
+        game.recorder.to_bytes(),
+        file_name=f"snake-{game.seed}.snk",
+        mime="application/octet-stream",
+        use_container_width=True,
+    )
     
     col1, col2 = st.columns(2)
     with col1:
         if st.button("🔄 Play Again", use_container_width=True):
-            init_game()
+            init_game(st.session_state.chosen_seed, game.board_size, st.session_state.level)
             st.session_state.game_started = True
             st.rerun()
     
@@ -281,21 +382,21 @@ if st.session_state.game_over:
             st.rerun()
 
 # Auto-play mode
-if st.session_state.game_started and not st.session_state.game_over:
+if st.session_state.game_started and not game.game_over:
     st.write("---")
-    auto_play = st.checkbox("🤖 Auto-play mode (moves automatically every 0.5 seconds)")
-    
-    if auto_play:
-        time.sleep(0.5)
-        move_snake()
-        st.rerun()
+    st.checkbox("🤖 Auto-play mode (moves automatically on a timer)", key="auto_play")
+    st.checkbox("🧠 Let the autopilot steer (pathfinding to the food)", key="use_autopilot")
+    st.slider("Tick interval (ms)", MIN_TICK_MS, 1000, DEFAULT_TICK_MS, step=50, key="tick_ms",
+              help="Time between automatic moves; the achieved ticks/sec is shown above the board")
+
+profiler.lap("game_over_and_autoplay")
 
 # Instructions
 st.write("---")
 st.markdown("""
 **How to Play:**
 1. Click "Start Game" to begin
-2. **Use WASD keys to control the snake** ⌨️ (focus the controls area above)
+2. **Use WASD keys to control the snake** ⌨️ (anywhere on the page)
 3. Alternatively, use the backup buttons below
 4. Eat the red food to grow and increase your score
 5. Avoid hitting walls or yourself
@@ -306,25 +407,78 @@ st.markdown("""
 - **Spacebar**: Move forward in current direction
 
 **Tips:**
-- Make sure the browser window is focused to capture keyboard events
+- Key presses are buffered, so quick sequences like D, S, A are all played in order
 - The snake moves in the direction of the last key pressed
 - You cannot move directly opposite to your current direction
 - Use "Auto Move" button or spacebar for continuous movement in the current direction
 - Enable "Auto-play mode" for automatic continuous movement
+- Turn on the autopilot as well to watch the AI chase the food on its own
 
 **Scoring:**
 - Each food eaten = 10 points
 - Try to beat your high score!
 """)
 
+profiler.lap("instructions")
+
 # Game stats
 if st.session_state.game_started:
     st.write("---")
     st.write("**Game Statistics:**")
     col1, col2 = st.columns(2)
     with col1:
-        st.write(f"🎯 Current Score: {st.session_state.score}")
-        st.write(f"📏 Snake Length: {len(st.session_state.snake)}")
+        st.write(f"🎯 Current Score: {game.score}")
+        st.write(f"📏 Snake Length: {len(game.snake)}")
     with col2:
-        st.write(f"🥇 High Score: {st.session_state.get('high_score', 0)}")
-        st.write(f"📍 Food Position: {st.session_state.food}") 
\ No newline at end of file
+        st.write(f"🥇 High Score: {high_score(game)}")
+        st.write(f"📍 Food Position: {game.food}") 
+
+# Leaderboard for the board and level being played
+st.write("---")
+with st.expander(f"🏆 Leaderboard · {game.board_size}x{game.board_size} {st.session_state.level}"):
+    top = leaderboard().top(game.board_size, st.session_state.level)
+    if top:
+        st.dataframe(
+            [{"Player": player, "Score": score, "Length": length,
+              "Played": time.strftime("%Y-%m-%d %H:%M", time.localtime(played_at))}
+             for player, score, length, played_at in top],
+            hide_index=True, use_container_width=True,
+        )
+    else:
+        st.write("No games recorded yet on this board.")
+    if leaderboard().failed:
+        st.warning(f"{leaderboard().failed} results could not be saved ({leaderboard().last_error})")
+
+# Replay viewer
+with st.expander("🎬 Replay Viewer"):
+    uploaded = st.file_uploader("Load a replay file (.snk)", type=["snk"])
+    if uploaded is not None:
+        if st.session_state.get('replay_file_id') != uploaded.file_id:
+            try:
+                st.session_state.replay = Replay(uploaded.getvalue())
+            except ValueError as error:
+                st.session_state.replay = None
+                st.error(f"Could not read replay: {error}")
+            st.session_state.replay_file_id = uploaded.file_id
+            st.session_state.replay_renderer = CanvasRenderer()
+        
+        replay = st.session_state.replay
+        if replay is not None:
+            tick = st.slider("Tick", 0, replay.ticks, replay.ticks) if replay.ticks else 0
+            replay_game = replay.game_at(tick)
+            st.write(f"🎯 Score: {replay_game.score} · 📏 Length: {len(replay_game.snake)} · "
+                     f"🕹️ {replay.ticks} ticks on a {replay.board_size}x{replay.board_size} "
+                     f"{replay.level} board")
+            st.session_state.replay_renderer.render(replay_game, CELL_SIZE, key="replay_board")
+
+profiler.lap("stats_and_replays")
+profiler.finish_run()
+
+# Profiling results
+if profiler.enabled:
+    with st.expander("⏱️ Rerun Profile", expanded=True):
+        st.caption("Milliseconds per stage (payload_bytes in bytes) over the last "
+                   f"{len(profiler.samples)} runs. 'board' includes its payload and component stages.")
+        st.dataframe(profiler.summary(), use_container_width=True)
+        st.download_button("📥 Export samples (CSV)", profiler.to_csv(),
+                           file_name="snake_profile.csv", mime="text/csv")
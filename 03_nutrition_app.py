@@ -4,7 +4,16 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date, timedelta
+import io
 import json
+import uuid
+
+from chart_sampling import CHART_WIDTH, downsample, render_mode, scatter_trace, selected_range
+from nutrition_foods import open_food_db
+from nutrition_log import NUTRIENTS
+from nutrition_planner import plan_meals
+from nutrition_search import FoodSearchIndex
+from nutrition_storage import SQLiteStorage, StoredFoodLog, export_parquet
 
 # =============================================================================
 # PAGE CONFIGURATION
@@ -16,14 +25,34 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# =============================================================================
+# STORAGE
+# =============================================================================
+@st.cache_resource
+def storage():
+    """One local database connection per process; sessions use their profile's view of it (swap in MemoryStorage() to keep nothing)"""
+    return SQLiteStorage()
+
+def user_storage():
+    """The storage of this session's profile (its log, profile and goals)"""
+    return storage().with_profile(st.session_state.profile_id)
+
 # =============================================================================
 # INITIALIZE SESSION STATE
 # =============================================================================
+# Each browser keeps its own data under a profile id in the page URL, so a refresh
+# (or a bookmark) finds it again
+if 'profile_id' not in st.session_state:
+    if 'profile' not in st.query_params:
+        st.query_params['profile'] = uuid.uuid4().hex
+    st.session_state.profile_id = st.query_params['profile']
+
+# Only the settings and today's entries are read now; other pages load their own date range
 if 'food_log' not in st.session_state:
-    st.session_state.food_log = []
+    st.session_state.food_log = StoredFoodLog(user_storage())
 
 if 'user_profile' not in st.session_state:
-    st.session_state.user_profile = {
+    st.session_state.user_profile = user_storage().get_setting('user_profile', {
         'name': '',
         'age': 25,
         'weight': 70,
@@ -31,58 +60,30 @@ if 'user_profile' not in st.session_state:
         'gender': 'Male',
         'activity_level': 'Moderate',
         'goal': 'Maintain'
-    }
+    })
 
 if 'daily_goals' not in st.session_state:
-    st.session_state.daily_goals = {
+    st.session_state.daily_goals = user_storage().get_setting('daily_goals', {
         'calories': 2000,
         'protein': 150,
         'carbs': 250,
         'fat': 65,
         'fiber': 25,
         'water': 8
-    }
+    })
 
 # =============================================================================
 # FOOD DATABASE
 # =============================================================================
-FOOD_DATABASE = {
-    # Fruits
-    'Apple (medium)': {'calories': 95, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4},
-    'Banana (medium)': {'calories': 105, 'protein': 1.3, 'carbs': 27, 'fat': 0.4, 'fiber': 3},
-    'Orange (medium)': {'calories': 80, 'protein': 2, 'carbs': 19, 'fat': 0.2, 'fiber': 3},
-    'Avocado (half)': {'calories': 160, 'protein': 2, 'carbs': 9, 'fat': 15, 'fiber': 7},
-    'Berries (1 cup)': {'calories': 85, 'protein': 1, 'carbs': 21, 'fat': 0.5, 'fiber': 8},
-    
-    # Vegetables
-    'Broccoli (1 cup)': {'calories': 55, 'protein': 4, 'carbs': 11, 'fat': 0.6, 'fiber': 5},
-    'Spinach (1 cup)': {'calories': 7, 'protein': 1, 'carbs': 1, 'fat': 0.1, 'fiber': 1},
-    'Carrots (1 cup)': {'calories': 50, 'protein': 1, 'carbs': 12, 'fat': 0.3, 'fiber': 4},
-    'Sweet Potato (medium)': {'calories': 115, 'protein': 2, 'carbs': 27, 'fat': 0.1, 'fiber': 4},
-    
-    # Proteins
-    'Chicken Breast (100g)': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0},
-    'Salmon (100g)': {'calories': 208, 'protein': 20, 'carbs': 0, 'fat': 13, 'fiber': 0},
-    'Eggs (2 large)': {'calories': 140, 'protein': 12, 'carbs': 1, 'fat': 10, 'fiber': 0},
-    'Greek Yogurt (1 cup)': {'calories': 130, 'protein': 20, 'carbs': 9, 'fat': 0, 'fiber': 0},
-    'Lentils (1 cup cooked)': {'calories': 230, 'protein': 18, 'carbs': 40, 'fat': 1, 'fiber': 16},
-    'Tofu (100g)': {'calories': 76, 'protein': 8, 'carbs': 2, 'fat': 4.8, 'fiber': 1},
-    
-    # Grains & Carbs
-    'Brown Rice (1 cup cooked)': {'calories': 220, 'protein': 5, 'carbs': 45, 'fat': 2, 'fiber': 4},
-    'Quinoa (1 cup cooked)': {'calories': 220, 'protein': 8, 'carbs': 39, 'fat': 4, 'fiber': 5},
-    'Oats (1 cup cooked)': {'calories': 150, 'protein': 5, 'carbs': 27, 'fat': 3, 'fiber': 4},
-    'Whole Wheat Bread (2 slices)': {'calories': 160, 'protein': 8, 'carbs': 28, 'fat': 2, 'fiber': 6},
-    
-    # Nuts & Seeds
-    'Almonds (28g/23 nuts)': {'calories': 160, 'protein': 6, 'carbs': 6, 'fat': 14, 'fiber': 3},
-    'Walnuts (28g/14 halves)': {'calories': 185, 'protein': 4, 'carbs': 4, 'fat': 18, 'fiber': 2},
-    'Chia Seeds (1 tbsp)': {'calories': 60, 'protein': 2, 'carbs': 5, 'fat': 4, 'fiber': 5},
-    
-    # Dairy
-    'Milk (1 cup)': {'calories': 150, 'protein': 8, 'carbs': 12, 'fat': 8, 'fiber': 0},
-    'Cheese (28g)': {'calories': 110, 'protein': 7, 'carbs': 1, 'fat': 9, 'fiber': 0},
-}
+@st.cache_resource
+def food_database():
+    """Memory-mapped food database, opened once per process and shared by every session.
+
+    Convert a bigger food table into it with ``python nutrition_foods.py foods.csv``.
+    """
+    return open_food_db()
+
+FOOD_DATABASE = food_database()
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -115,17 +116,47 @@ def adjust_calories_for_goal(tdee, goal):
     else:
         return tdee  # Maintain weight
 
+@st.cache_resource
+def food_search_index():
+    """Typo-tolerant search index over the food names, built once and shared by every session"""
+    return FoodSearchIndex(FOOD_DATABASE.names())
+
+# Keywords of the Quick Meal Builder's categories, and how many foods each lists
+MEAL_BUILDER_KEYWORDS = {
+    'protein': ['chicken', 'salmon', 'eggs', 'yogurt', 'lentils', 'tofu'],
+    'carb': ['rice', 'quinoa', 'oats', 'bread'],
+    'veggie': ['broccoli', 'spinach', 'carrots', 'sweet potato'],
+}
+FOOD_CHOICES = 50
+
+@st.cache_resource
+def meal_builder_options():
+    """The first FOOD_CHOICES foods (by name) of each Quick Meal Builder category, found once per process"""
+    names = FOOD_DATABASE.names()
+    options = {category: [] for category in MEAL_BUILDER_KEYWORDS}
+    for food_id in FOOD_DATABASE.sort_order('name').tolist():
+        name = names[food_id].lower()
+        for category, keywords in MEAL_BUILDER_KEYWORDS.items():
+            if len(options[category]) < FOOD_CHOICES and any(keyword in name for keyword in keywords):
+                options[category].append(names[food_id])
+        if all(len(foods) == FOOD_CHOICES for foods in options.values()):
+            break
+    return options
+
+def chart_totals(key, start_date, end_date, columns):
+    """Daily totals for chart ``key``: the period box-selected on it (else the picked
+    range), re-queried at full detail and downsampled to a half-width chart, with
+    the number of days before downsampling"""
+    zoom = selected_range(st.session_state.get(key))
+    if zoom is not None:
+        start_date = max(start_date, pd.Timestamp(zoom[0]).date())
+        end_date = min(end_date, pd.Timestamp(zoom[1]).date())
+    totals = st.session_state.food_log.daily_totals(start_date, end_date)
+    return downsample(totals, 'date', columns, width=CHART_WIDTH // 2), len(totals)
+
 def get_today_intake():
-    """Get today's nutrition intake from food log"""
-    today = date.today()
-    today_log = [entry for entry in st.session_state.food_log if entry['date'] == today]
-    
-    total = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0, 'fiber': 0}
-    for entry in today_log:
-        for nutrient in total:
-            total[nutrient] += entry.get(nutrient, 0)
-    
-    return total, today_log
+    """Get today's nutrition intake from food log (only today's entries are read)"""
+    return st.session_state.food_log.today()
 
 def create_macro_pie_chart(protein, carbs, fat):
     """Create a pie chart for macronutrients"""
@@ -212,7 +243,9 @@ if page == "🏠 Dashboard":
     adjusted_calories = adjust_calories_for_goal(tdee, profile['goal'])
     
     # Update daily goals
-    st.session_state.daily_goals['calories'] = int(adjusted_calories)
+    if st.session_state.daily_goals['calories'] != int(adjusted_calories):
+        st.session_state.daily_goals['calories'] = int(adjusted_calories)
+        user_storage().set_setting('daily_goals', st.session_state.daily_goals)
     
     # Get today's intake
     today_intake, today_log = get_today_intake()
@@ -333,6 +366,7 @@ elif page == "👤 Profile Setup":
                 'activity_level': activity_level,
                 'goal': goal
             }
+            user_storage().set_setting('user_profile', st.session_state.user_profile)
             st.success("Profile updated successfully!")
     
     # Show calculated values
@@ -360,9 +394,14 @@ elif page == "🍎 Add Food":
     search_term = st.text_input("Search for food:", placeholder="Type to search...")
     
     if search_term:
-        filtered_foods = {k: v for k, v in FOOD_DATABASE.items() if search_term.lower() in k.lower()}
+        # Best matches first, typos included
+        filtered_foods = {name: FOOD_DATABASE[name] for name in food_search_index().search(search_term, limit=FOOD_CHOICES)}
     else:
-        filtered_foods = FOOD_DATABASE
+        # Just the first foods by name; the rest are a search away
+        first_foods = FOOD_DATABASE.sort_order('name')[:FOOD_CHOICES].tolist()
+        filtered_foods = {FOOD_DATABASE.name(i): FOOD_DATABASE.nutrition(i) for i in first_foods}
+        if len(FOOD_DATABASE) > FOOD_CHOICES:
+            st.caption(f"Showing the first {FOOD_CHOICES} of {len(FOOD_DATABASE):,} foods; search to find the others.")
     
     if filtered_foods:
         selected_food = st.selectbox("Select a food:", list(filtered_foods.keys()))
@@ -444,15 +483,14 @@ elif page == "🍎 Add Food":
 elif page == "📊 Progress Analysis":
     st.title("📊 Progress Analysis")
     
-    if not st.session_state.food_log:
+    if st.session_state.food_log.first_day() is None:
         st.info("Start logging food to see your progress analysis!")
     else:
-        # Convert food log to DataFrame
-        df = pd.DataFrame(st.session_state.food_log)
+        food_log = st.session_state.food_log
         
         # Date range selection
-        min_date = df['date'].min()
-        max_date = df['date'].max()
+        min_date = food_log.first_day()
+        max_date = food_log.last_day()
         
         col1, col2 = st.columns(2)
         with col1:
@@ -460,31 +498,24 @@ elif page == "📊 Progress Analysis":
         with col2:
             end_date = st.date_input("To:", value=max_date, min_value=min_date, max_value=max_date)
         
-        # Filter data
-        mask = (df['date'] >= start_date) & (df['date'] <= end_date)
-        filtered_df = df.loc[mask]
+        # Daily totals: a slice of the per-day table, kept up to date by every write
+        daily_totals = food_log.daily_totals(start_date, end_date)
         
-        if not filtered_df.empty:
-            # Daily totals
-            daily_totals = filtered_df.groupby('date').agg({
-                'calories': 'sum',
-                'protein': 'sum',
-                'carbs': 'sum',
-                'fat': 'sum',
-                'fiber': 'sum'
-            }).reset_index()
-            
-            # Charts
+        if not daily_totals.empty:
+            # Charts (long ranges are downsampled; a box selection zooms in at full detail)
+            st.caption("Box-select a period on a chart to zoom in, double-click it to zoom back out.")
             col1, col2 = st.columns(2)
             
             with col1:
                 # Calories over time
+                calories, points = chart_totals("calories_chart", start_date, end_date, ['calories'])
                 fig_calories = px.line(
-                    daily_totals, 
+                    calories, 
                     x='date', 
                     y='calories',
                     title="Daily Calories Over Time",
-                    markers=True
+                    markers=True,
+                    render_mode=render_mode(points)
                 )
                 fig_calories.add_hline(
                     y=st.session_state.daily_goals['calories'], 
@@ -492,16 +523,19 @@ elif page == "📊 Progress Analysis":
                     line_color="red",
                     annotation_text="Goal"
                 )
-                st.plotly_chart(fig_calories, use_container_width=True)
+                st.plotly_chart(fig_calories, use_container_width=True, on_select="rerun",
+                                selection_mode="box", key="calories_chart")
             
             with col2:
                 # Macronutrients over time
+                macros, points = chart_totals("macros_chart", start_date, end_date, ['protein', 'carbs', 'fat'])
                 fig_macros = go.Figure()
-                fig_macros.add_trace(go.Scatter(x=daily_totals['date'], y=daily_totals['protein'], mode='lines+markers', name='Protein'))
-                fig_macros.add_trace(go.Scatter(x=daily_totals['date'], y=daily_totals['carbs'], mode='lines+markers', name='Carbs'))
-                fig_macros.add_trace(go.Scatter(x=daily_totals['date'], y=daily_totals['fat'], mode='lines+markers', name='Fat'))
+                fig_macros.add_trace(scatter_trace(points, x=macros['date'], y=macros['protein'], mode='lines+markers', name='Protein'))
+                fig_macros.add_trace(scatter_trace(points, x=macros['date'], y=macros['carbs'], mode='lines+markers', name='Carbs'))
+                fig_macros.add_trace(scatter_trace(points, x=macros['date'], y=macros['fat'], mode='lines+markers', name='Fat'))
                 fig_macros.update_layout(title="Daily Macronutrients Over Time", xaxis_title="Date", yaxis_title="Grams")
-                st.plotly_chart(fig_macros, use_container_width=True)
+                st.plotly_chart(fig_macros, use_container_width=True, on_select="rerun",
+                                selection_mode="box", key="macros_chart")
             
             # Summary statistics
             st.subheader("Summary Statistics")
@@ -536,6 +570,17 @@ elif page == "📊 Progress Analysis":
             for goal_name, achievement in achievements.items():
                 success_rate = (achievement.sum() / len(daily_totals)) * 100
                 st.write(f"**{goal_name} Goal Achievement:** {success_rate:.1f}% of days")
+            
+            # Export for analysis in other tools (only built when asked for)
+            if st.button("Export range as Parquet"):
+                parquet = io.BytesIO()
+                export_parquet(user_storage(), parquet, start_date, end_date)
+                st.download_button(
+                    "Download Parquet file",
+                    parquet.getvalue(),
+                    file_name=f"food_log_{start_date}_{end_date}.parquet",
+                    mime="application/octet-stream"
+                )
 
 elif page == "🥗 Meal Planner":
     st.title("🥗 Meal Planner")
@@ -620,6 +665,49 @@ elif page == "🥗 Meal Planner":
         for suggestion in dinner_suggestions:
             st.write(f"• {suggestion}")
     
+    # Meal plan optimizer
+    st.subheader("Meal Plan Optimizer")
+    st.write("Pick foods and servings from the food database that add up to your daily goals:")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        plan_days = st.number_input("Days:", min_value=1, max_value=14, value=1)
+    with col2:
+        plan_meal_count = st.number_input("Meals per day:", min_value=1, max_value=6, value=3)
+    with col3:
+        plan_foods = st.number_input("Foods per meal:", min_value=1, max_value=5, value=3)
+    with col4:
+        plan_budget = st.slider("Time budget (s):", min_value=0.1, max_value=3.0, value=0.5, step=0.1)
+    
+    if st.button("Generate Meal Plan"):
+        try:
+            st.session_state.meal_plan = plan_meals(FOOD_DATABASE, st.session_state.daily_goals,
+                                                    days=plan_days, meals=plan_meal_count,
+                                                    foods_per_meal=plan_foods, time_budget=plan_budget)
+        except ValueError as error:
+            st.error(str(error))
+    
+    if 'meal_plan' in st.session_state:
+        plan = st.session_state.meal_plan
+        plan_df = plan.frame()
+        plan_totals = plan.totals()
+        goals = st.session_state.daily_goals
+        
+        for day, tab in enumerate(st.tabs([f"Day {day}" for day in range(1, plan.days + 1)]), start=1):
+            with tab:
+                day_totals = plan_totals.iloc[day - 1]
+                for column, nutrient in zip(st.columns(len(NUTRIENTS)), NUTRIENTS):
+                    with column:
+                        st.metric(nutrient.title(), f"{day_totals[nutrient]:.0f}",
+                                  delta=f"{day_totals[nutrient] - goals[nutrient]:+.0f} vs goal",
+                                  delta_color="off")
+                day_df = plan_df[plan_df['day'] == day]
+                for meal, meal_df in day_df.groupby('meal'):
+                    st.write(f"**Meal {meal}** ({meal_df['calories'].sum():.0f} calories)")
+                    st.dataframe(meal_df.drop(columns=['day', 'meal']).round(1),
+                                 use_container_width=True, hide_index=True)
+    
     # Quick meal builder
     st.subheader("Quick Meal Builder")
     st.write("Build a balanced meal by selecting components:")
@@ -627,21 +715,20 @@ elif page == "🥗 Meal Planner":
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        protein_options = [food for food in FOOD_DATABASE.keys() if any(keyword in food.lower() for keyword in ['chicken', 'salmon', 'eggs', 'yogurt', 'lentils', 'tofu'])]
-        selected_protein = st.selectbox("Choose a protein:", protein_options)
+        selected_protein = st.selectbox("Choose a protein:", meal_builder_options()['protein'])
     
     with col2:
-        carb_options = [food for food in FOOD_DATABASE.keys() if any(keyword in food.lower() for keyword in ['rice', 'quinoa', 'oats', 'bread'])]
-        selected_carb = st.selectbox("Choose a carb:", carb_options)
+        selected_carb = st.selectbox("Choose a carb:", meal_builder_options()['carb'])
     
     with col3:
-        veggie_options = [food for food in FOOD_DATABASE.keys() if any(keyword in food.lower() for keyword in ['broccoli', 'spinach', 'carrots', 'sweet potato'])]
-        selected_veggie = st.selectbox("Choose vegetables:", veggie_options)
+        selected_veggie = st.selectbox("Choose vegetables:", meal_builder_options()['veggie'])
     
     if st.button("Calculate Meal Nutrition"):
         total_nutrition = {'calories': 0, 'protein': 0, 'carbs': 0, 'fat': 0, 'fiber': 0}
         
         for food in [selected_protein, selected_carb, selected_veggie]:
+            if food is None:  # A category with no foods in the database
+                continue
             food_data = FOOD_DATABASE[food]
             for nutrient in total_nutrition:
                 total_nutrition[nutrient] += food_data[nutrient]
@@ -674,44 +761,48 @@ elif page == "📱 Food Database":
     with col2:
         max_calories = st.slider("Maximum calories:", 0, 500, 500)
     
-    # Create DataFrame from food database
-    foods_data = []
-    for food_name, nutrition in FOOD_DATABASE.items():
-        if search.lower() in food_name.lower() or not search:
-            if nutrition['protein'] >= min_protein and nutrition['calories'] <= max_calories:
-                foods_data.append({
-                    'Food': food_name,
-                    'Calories': nutrition['calories'],
-                    'Protein (g)': nutrition['protein'],
-                    'Carbs (g)': nutrition['carbs'],
-                    'Fat (g)': nutrition['fat'],
-                    'Fiber (g)': nutrition['fiber']
-                })
-    
-    if foods_data:
-        df = pd.DataFrame(foods_data)
-        
-        # Sort options
-        sort_by = st.selectbox("Sort by:", ['Food', 'Calories', 'Protein (g)', 'Carbs (g)', 'Fat (g)', 'Fiber (g)'])
+    # Filters are boolean masks over the database's columns
+    food_columns = {'Calories': 'calories', 'Protein (g)': 'protein', 'Carbs (g)': 'carbs',
+                    'Fat (g)': 'fat', 'Fiber (g)': 'fiber'}
+    mask = (FOOD_DATABASE.column('protein') >= min_protein) & (FOOD_DATABASE.column('calories') <= max_calories)
+    if search:
+        matches = np.zeros(len(FOOD_DATABASE), dtype=bool)
+        # Fuzzy matches, plus every name containing the search (like "an" in Banana)
+        matches[food_search_index().search_ids(search, limit=None)] = True
+        matches[food_search_index().contains_ids(search)] = True
+        mask &= matches
+    
+    if mask.any():
+        # Sort options (every column's sort order is precomputed, so sorting is one mask lookup)
+        sort_by = st.selectbox("Sort by:", ['Food'] + list(food_columns))
         ascending = st.checkbox("Ascending order", value=True)
         
-        df_sorted = df.sort_values(by=sort_by, ascending=ascending)
+        food_ids = FOOD_DATABASE.select(mask, food_columns.get(sort_by, 'name'), ascending)
         
-        # Display the data
-        st.dataframe(df_sorted, use_container_width=True, height=400)
+        # Display the data, one page at a time (only the page shown becomes a DataFrame)
+        page_size = 100
+        pages = (len(food_ids) - 1) // page_size + 1
+        page_number = st.number_input(f"Page (of {pages:,}):", min_value=1, max_value=pages, value=1)
+        shown = food_ids[(page_number - 1) * page_size:page_number * page_size]
+        df_page = pd.DataFrame({'Food': [FOOD_DATABASE.name(i) for i in shown.tolist()],
+                                **{label: FOOD_DATABASE.column(nutrient)[shown]
+                                   for label, nutrient in food_columns.items()}})
+        st.dataframe(df_page, use_container_width=True, height=400, hide_index=True)
+        st.caption(f"Showing {(page_number - 1) * page_size + 1:,}–{(page_number - 1) * page_size + len(shown):,} "
+                   f"of {len(food_ids):,} foods")
         
         # Quick stats
         st.subheader("Database Statistics")
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Foods", len(df_sorted))
+            st.metric("Total Foods", len(food_ids))
         with col2:
-            st.metric("Avg Calories", f"{df_sorted['Calories'].mean():.0f}")
+            st.metric("Avg Calories", f"{FOOD_DATABASE.column('calories')[mask].mean():.0f}")
         with col3:
-            st.metric("Highest Protein", f"{df_sorted['Protein (g)'].max():.1f}g")
+            st.metric("Highest Protein", f"{FOOD_DATABASE.column('protein')[mask].max():.1f}g")
         with col4:
-            st.metric("Highest Fiber", f"{df_sorted['Fiber (g)'].max():.1f}g")
+            st.metric("Highest Fiber", f"{FOOD_DATABASE.column('fiber')[mask].max():.1f}g")
     
     else:
         st.info("No foods match your search criteria. Try adjusting your filters.")
@@ -723,7 +814,7 @@ st.sidebar.markdown("---")
 st.sidebar.markdown("### Quick Stats")
 today_intake, _ = get_today_intake()
 st.sidebar.metric("Today's Calories", f"{today_intake['calories']:.0f}")
-st.sidebar.metric("Foods Logged", len([entry for entry in st.session_state.food_log if entry['date'] == date.today()]))
+st.sidebar.metric("Foods Logged", st.session_state.food_log.count_on(date.today()))
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("""
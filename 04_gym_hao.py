@@ -10,6 +10,8 @@ import json
 from PIL import Image
 import io
 
+from chart_sampling import CHART_WIDTH, downsample, render_mode, selected_range
+
 # =============================================================================
 # CONFIGURATION AND TRANSLATIONS
 # =============================================================================
@@ -288,6 +290,21 @@ def generate_training_plan(goal, fitness_level, available_time):
     base_plan = plans.get(goal, plans['general_fitness'])
     return base_plan.get(fitness_level, base_plan['beginner'])
 
+def chart_frame(frame, key, column, width=CHART_WIDTH):
+    """``frame`` as chart ``key`` draws ``column``: cut to the period box-selected on it, downsampled
+    to its width, with the number of rows before downsampling"""
+    zoom = selected_range(st.session_state.get(key))
+    if zoom is not None:
+        dates = pd.to_datetime(frame['date'])
+        frame = frame[(dates >= pd.Timestamp(zoom[0]).normalize()) & (dates <= pd.Timestamp(zoom[1]))]
+    return downsample(frame, 'date', [column], width), len(frame)
+
+def progress_line(frame, key, column, width=CHART_WIDTH, **kwargs):
+    """Line chart of ``column`` over ``date``, downsampled, in WebGL when long, zoomable by box selection"""
+    frame, points = chart_frame(frame, key, column, width)
+    fig = px.line(frame, x='date', y=column, markers=True, render_mode=render_mode(points), **kwargs)
+    st.plotly_chart(fig, use_container_width=True, on_select="rerun", selection_mode="box", key=key)
+
 def get_anime_quotes():
     quotes = [
         "The moment you give up is the moment you let someone else win! - Kobe Bryant x Vegeta",
@@ -613,10 +630,8 @@ def main():
             daily_workouts = workout_df.groupby(workout_df['date'].dt.date).size().reset_index()
             daily_workouts.columns = ['date', 'workouts']
             
-            fig = px.line(daily_workouts, x='date', y='workouts', 
-                         title="Daily Workout Frequency",
-                         markers=True)
-            st.plotly_chart(fig, use_container_width=True)
+            progress_line(daily_workouts, 'workouts_chart', 'workouts', title="Daily Workout Frequency")
+            st.caption("Box-select a period on a progress chart to zoom in, double-click it to zoom back out.")
             
             # Calories burned over time
             daily_calories = workout_df.groupby(workout_df['date'].dt.date)['calories'].sum().reset_index()
@@ -632,20 +647,17 @@ def main():
         with col1:
             st.subheader(get_text('weight_progress'))
             weight_df = pd.DataFrame(st.session_state.user_stats['weight_data'])
-            fig = px.line(weight_df, x='date', y='weight', markers=True)
-            st.plotly_chart(fig, use_container_width=True)
+            progress_line(weight_df, 'weight_chart', 'weight', width=CHART_WIDTH // 3)
         
         with col2:
             st.subheader(get_text('strength_progress'))
             strength_df = pd.DataFrame(st.session_state.user_stats['strength_data'])
-            fig = px.line(strength_df, x='date', y='bench_press', markers=True)
-            st.plotly_chart(fig, use_container_width=True)
+            progress_line(strength_df, 'strength_chart', 'bench_press', width=CHART_WIDTH // 3)
         
         with col3:
             st.subheader(get_text('endurance_progress'))
             endurance_df = pd.DataFrame(st.session_state.user_stats['endurance_data'])
-            fig = px.line(endurance_df, x='date', y='running_time', markers=True)
-            st.plotly_chart(fig, use_container_width=True)
+            progress_line(endurance_df, 'endurance_chart', 'running_time', width=CHART_WIDTH // 3)
 
     # =============================================================================
     # GYM RANKING PAGE
@@ -0,0 +1,43 @@
+"""Payload and cost of downsampling a long time series before charting it.
+
+Builds a random walk of ``--points`` timestamped values and compares the
+Plotly figure JSON sent to the browser for every point against the
+``downsample``d series at ``--width`` pixels, with the time it takes and the
+render mode each gets (the downsampled one stays WebGL: long series always do).
+
+    python -m benchmarks.chart_sampling --points 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from chart_sampling import CHART_WIDTH, downsample, render_mode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=CHART_WIDTH)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'date': pd.date_range('2000-01-01', periods=args.points, freq='h'),
+                          'value': rng.normal(size=args.points).cumsum()})
+
+    start = time.perf_counter()
+    sampled = downsample(frame, 'date', ['value'], args.width)
+    took = time.perf_counter() - start
+
+    print(f"{args.points:,} points at {args.width}px")
+    print(f"{'':<14} {'points':>10} {'JSON MB':>9} {'ms':>8} {'mode':>6}")
+    mode = render_mode(len(frame))
+    for label, data, ms in (("every point", frame, "-"), ("downsampled", sampled, f"{took * 1000:.1f}")):
+        figure = px.line(data, x='date', y='value', render_mode=mode)
+        print(f"{label:<14} {len(data):>10,} {len(figure.to_json()) / 1e6:>9.2f} {ms:>8} {mode:>6}")
+
+
+if __name__ == "__main__":
+    main()
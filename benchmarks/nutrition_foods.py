@@ -0,0 +1,90 @@
+"""Open and lookup cost of the memory-mapped food database.
+
+Writes a synthetic table of ``--foods`` foods with ``--nutrients`` nutrient
+columns as CSV, converts it with ``build_food_db``, then times opening the
+database (what a new process pays), name lookups and a full column scan,
+against reading the CSV into a dict of dicts as the app used to hold it.
+Then times one Food Database page rerun (filter by protein and calories,
+sort by protein, build the page shown): looping over the dict and sorting a
+DataFrame, against masks over the columns and a precomputed sort order.
+
+    python -m benchmarks.nutrition_foods --foods 500000 --nutrients 30
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.nutrition_search import make_names
+from nutrition_foods import FoodDatabase, build_food_db, read_food_table
+from nutrition_log import NUTRIENTS
+
+
+def timed(function, repeat=1):
+    """Best milliseconds per call of ``function``"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=500_000)
+    parser.add_argument("--nutrients", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = list(dict.fromkeys(make_names(args.foods)))
+    columns = list(NUTRIENTS) + [f"nutrient_{i}" for i in range(args.nutrients - len(NUTRIENTS))]
+    table = pd.DataFrame(rng.uniform(0, 100, (len(names), len(columns))).round(1), columns=columns)
+    table.insert(0, 'name', names)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'foods.csv')
+        table.to_csv(source, index=False)
+        target = os.path.join(directory, 'food_db')
+        start = time.perf_counter()
+        build_food_db(read_food_table(source), target)
+        print(f"{len(names):,} foods x {len(columns)} nutrients, converted in "
+              f"{time.perf_counter() - start:.1f}s")
+
+        def as_dict():
+            frame = pd.read_csv(source).set_index('name')
+            return frame.to_dict(orient='index')
+
+        start = time.perf_counter()
+        foods = as_dict()
+        parse_ms = (time.perf_counter() - start) * 1000
+        db = FoodDatabase(target)
+        picks = random.Random(0).sample(names, 1000)
+        print(f"{'':<28} {'ms':>10}")
+        print(f"{'CSV -> dict of dicts':<28} {parse_ms:>10.1f}")
+        print(f"{'open FoodDatabase':<28} {timed(lambda: FoodDatabase(target), repeat=20):>10.3f}")
+        print(f"{'lookup by name (each)':<28} {timed(lambda: [db[name] for name in picks]) / 1000:>10.4f}")
+        print(f"{'sum of one column':<28} {timed(lambda: db.column('protein').sum(), repeat=5):>10.3f}")
+        print(f"{'decode all names':<28} {timed(db.names):>10.1f}")
+
+        def loop_rerun():
+            rows = [{'Food': name, **nutrition} for name, nutrition in foods.items()
+                    if nutrition['protein'] >= 10 and nutrition['calories'] <= 400]
+            return pd.DataFrame(rows).sort_values('protein', ascending=False).head(100)
+
+        def masked_rerun():
+            mask = (db.column('protein') >= 10) & (db.column('calories') <= 400)
+            shown = db.select(mask, 'protein', ascending=False)[:100]
+            return pd.DataFrame({'Food': [db.name(i) for i in shown.tolist()],
+                                 **{nutrient: db.column(nutrient)[shown] for nutrient in NUTRIENTS}})
+
+        print(f"{'page rerun, dict loop':<28} {timed(loop_rerun, repeat=3):>10.1f}")
+        print(f"{'page rerun, masks + order':<28} {timed(masked_rerun, repeat=20):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
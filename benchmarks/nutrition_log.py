@@ -0,0 +1,89 @@
+"""Memory and query cost of the columnar food log against a list of dicts.
+
+Logs ``--entries`` foods spread over ``--days`` days both as the original
+list of entry dicts and as a ``FoodLog``, then compares memory per entry,
+building the Progress Analysis DataFrame, and reading today's totals.
+FoodLog bytes include its spare capacity. Then times Progress Analysis'
+daily totals for the last 90 days: grouping the raw entries by date against
+slicing the per-day ``DailyTotals`` table.
+
+    python -m benchmarks.nutrition_log --entries 300000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import pandas as pd
+
+from nutrition_log import NUTRIENTS, FoodLog
+
+FOODS = ['Apple (medium)', 'Banana (medium)', 'Chicken Breast (100g)', 'Brown Rice (1 cup cooked)',
+         'Greek Yogurt (1 cup)', 'Almonds (28g/23 nuts)', 'Eggs (2 large)', 'Salmon (100g)']
+
+
+def make_entries(count, days, seed=0):
+    rng = random.Random(seed)
+    first = date.today() - timedelta(days=days - 1)
+    for i in range(count):
+        servings = rng.choice((0.5, 1.0, 1.5, 2.0))
+        entry = {'date': first + timedelta(days=i * days // count),
+                 'food': f"{rng.choice(FOODS)} (x{servings})"}
+        entry.update({nutrient: rng.uniform(0, 100) * servings for nutrient in NUTRIENTS})
+        yield entry
+
+
+def measured(build):
+    """(result, bytes allocated and still held) of ``build()``"""
+    tracemalloc.start()
+    result = build()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, held
+
+
+def timed(function, repeat=5):
+    """Best milliseconds per call of ``function``"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    args = parser.parse_args()
+
+    entries, list_bytes = measured(lambda: list(make_entries(args.entries, args.days)))
+    log, log_bytes = measured(lambda: FoodLog(make_entries(args.entries, args.days)))
+    today = date.today()
+
+    def list_today():
+        today_log = [entry for entry in entries if entry['date'] == today]
+        return {nutrient: sum(entry[nutrient] for entry in today_log) for nutrient in NUTRIENTS}
+
+    print(f"{args.entries:,} entries over {args.days} days")
+    print(f"{'':<16} {'bytes/entry':>12} {'DataFrame ms':>13} {'today ms':>10}")
+    print(f"{'list of dicts':<16} {list_bytes / args.entries:>12.0f} "
+          f"{timed(lambda: pd.DataFrame(entries), repeat=1):>13.1f} {timed(list_today):>10.3f}")
+    print(f"{'FoodLog':<16} {log_bytes / args.entries:>12.0f} "
+          f"{timed(log.frame):>13.3f} {timed(log.today):>10.3f}")
+
+    daily = log.daily_totals()
+    first = today - timedelta(days=89)
+
+    def grouped():
+        return log.frame(first, today).groupby('date')[list(NUTRIENTS)].sum().reset_index()
+
+    print(f"\n{'daily totals, 90 days':<28} {'ms':>8}")
+    print(f"{'groupby over entries':<28} {timed(grouped):>8.3f}")
+    print(f"{'DailyTotals slice':<28} {timed(lambda: daily.frame(first, today)):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
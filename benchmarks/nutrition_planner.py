@@ -0,0 +1,58 @@
+"""Time and accuracy of the meal plan optimizer on a large synthetic food database.
+
+Builds ``--foods`` foods with random macros (calories follow from them, as in
+real food tables) into a temporary ``FoodDatabase``, then plans ``--days``
+days against the app's default goals for a few time budgets and reports how
+far the daily totals land from the goals. Those goals' macros alone add up
+to 2185 calories, so no plan meets all five; the errors show the compromise.
+
+    python -m benchmarks.nutrition_planner --foods 100000 --days 7
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from nutrition_foods import FoodDatabase, build_food_db
+from nutrition_planner import plan_meals
+
+GOALS = {'calories': 2000, 'protein': 150, 'carbs': 250, 'fat': 65, 'fiber': 25}
+
+
+def make_foods(count, seed=0):
+    rng = np.random.default_rng(seed)
+    protein, carbs, fat = rng.gamma(2, 6, count), rng.gamma(2, 12, count), rng.gamma(2, 5, count)
+    return pd.DataFrame({'name': [f"Food {i}" for i in range(count)],
+                         'calories': 4 * protein + 4 * carbs + 9 * fat,
+                         'protein': protein, 'carbs': carbs, 'fat': fat,
+                         'fiber': rng.gamma(1.5, 2, count)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--meals", type=int, default=3)
+    parser.add_argument("--foods-per-meal", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_food_db(make_foods(args.foods), directory)
+        database = FoodDatabase(directory)
+        print(f"{args.foods:,} foods, {args.days} days x {args.meals} meals x {args.foods_per_meal} foods")
+        print(f"{'budget s':>8} {'took s':>7}  mean |error| vs goal per nutrient (fiber: shortfall only)")
+        for budget in (0.05, 0.25, 0.5, 1.0):
+            start = time.perf_counter()
+            plan = plan_meals(database, GOALS, days=args.days, meals=args.meals,
+                              foods_per_meal=args.foods_per_meal, time_budget=budget, seed=0)
+            took = time.perf_counter() - start
+            error = plan.totals()[list(GOALS)] / pd.Series(GOALS) - 1
+            error['fiber'] = error['fiber'].clip(upper=0)
+            summary = "  ".join(f"{nutrient} {value:.1%}" for nutrient, value in error.abs().mean().items())
+            print(f"{budget:>8.2f} {took:>7.2f}  {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Query latency of the food search index on a large synthetic food database.
+
+Builds ``--foods`` names shaped like national nutrient database entries
+("Chicken, breast, roasted, with skin (Brand 12)"), then times uncached
+searches (exact words, typos, partial words as typed) against the original
+substring scan over every name. Also times ``contains_ids``, which the Food
+Database filter adds to the fuzzy matches, and checks that together they
+find every name the substring scan finds.
+
+    python -m benchmarks.nutrition_search --foods 500000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from nutrition_search import FoodSearchIndex
+
+BASES = ["Chicken", "Beef", "Pork", "Turkey", "Salmon", "Tuna", "Cod", "Shrimp", "Egg", "Tofu",
+         "Lentils", "Chickpeas", "Black beans", "Rice", "Quinoa", "Oats", "Barley", "Pasta", "Bread",
+         "Tortilla", "Potato", "Sweet potato", "Broccoli", "Spinach", "Kale", "Carrots", "Peppers",
+         "Tomato", "Onion", "Apple", "Banana", "Orange", "Strawberries", "Blueberries", "Mango",
+         "Avocado", "Almonds", "Walnuts", "Peanut butter", "Cheese", "Milk", "Yogurt", "Butter",
+         "Olive oil", "Granola", "Cereal", "Crackers", "Cookies", "Soup", "Pizza"]
+PARTS = ["", "breast", "thigh", "whole", "ground", "fillet", "sliced", "diced", "dried", "frozen",
+         "canned", "low fat", "whole grain", "unsalted", "organic"]
+METHODS = ["raw", "roasted", "grilled", "boiled", "fried", "baked", "steamed", "smoked", "cooked"]
+QUERIES = ["chicken breast", "chiken brest", "sweet potato", "swet potatoe", "bluebery",
+           "greek yog", "olive", "almnds roasted", "pb", "ch", "brown rice cooked", "zucchini",
+           "an", "ach", "ee"]
+
+
+def make_names(count, seed=0):
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        words = [rng.choice(BASES)]
+        part = rng.choice(PARTS)
+        if part:
+            words.append(part)
+        words.append(rng.choice(METHODS))
+        names.append(f"{', '.join(words)} (Brand {rng.randrange(5000)})")
+    return names
+
+
+def percentiles(times):
+    times = np.array(times) * 1000
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--foods", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    names = make_names(args.foods)
+    start = time.perf_counter()
+    index = FoodSearchIndex(names)
+    print(f"{args.foods:,} foods, index built in {time.perf_counter() - start:.1f}s")
+
+    print(f"{'query':<20} {'p50 ms':>8} {'p95 ms':>8} {'scan ms':>8} {'subst ms':>8}  best match")
+    indexed_all, scan_all = [], []
+    for query in QUERIES:
+        indexed = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            ids = index._search(query, 20)  # Bypasses the result cache
+            indexed.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scanned = [i for i, name in enumerate(names) if query.lower() in name.lower()]
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        contained = index._contains(query)
+        substring = time.perf_counter() - start
+        # The Food Database filter (fuzzy matches plus contains_ids) misses no substring match
+        found = np.zeros(len(names), dtype=bool)
+        found[index._search(query, None)] = True
+        found[contained] = True
+        if not found[scanned].all():
+            raise AssertionError(f"{query!r}: the filter misses {(~found[scanned]).sum()} substring matches")
+        indexed_all += indexed
+        scan_all.append(scan)
+        best = names[ids[0]] if len(ids) else "-"
+        p50, p95 = percentiles(indexed)
+        print(f"{query:<20} {p50:>8.2f} {p95:>8.2f} {scan * 1000:>8.1f} {substring * 1000:>8.1f}  {best}")
+    p50, p95 = percentiles(indexed_all)
+    print(f"{'all queries':<20} {p50:>8.2f} {p95:>8.2f} {np.mean(scan_all) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
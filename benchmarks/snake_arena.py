@@ -0,0 +1,80 @@
+"""Tick time of the shared-board arena with many bot snakes.
+
+Runs ``--snakes`` bots on one board (dead bots respawn) and reports the
+arena tick time, then times a naive collision check that scans every body
+for every head on the same states, which grows with snakes x total length.
+
+    python -m benchmarks.snake_arena --snakes 500 --board-size 1000 --ticks 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from snake_arena import Arena, bot_actions
+from snake_engine import _DX, _DY
+
+
+def naive_collisions(arena, actions):
+    """Which live snakes would hit a body, checking every head against every body.
+
+    Works on plain Python ints (as a non-NumPy implementation would), so the
+    comparison isn't slowed by NumPy scalars.
+    """
+    size = arena.board_size
+    ids = np.flatnonzero(arena.alive).tolist()
+    bodies = [[int(cell) for cell in arena.bodies[i]] for i in ids]
+    actions, directions, heads = actions.tolist(), arena.direction.tolist(), arena.heads.tolist()
+    dx, dy = _DX.tolist(), _DY.tolist()
+    hits = []
+    for snake_id in ids:
+        direction = actions[snake_id] if actions[snake_id] >= 0 else directions[snake_id]
+        head = heads[snake_id]
+        target = (head // size + dy[direction]) * size + head % size + dx[direction]
+        hits.append(any(target in body for body in bodies))
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--snakes", type=int, default=500)
+    parser.add_argument("--board-size", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--naive-ticks", type=int, default=20,
+                        help="Ticks (spread over the run) to also time the naive check on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    arena = Arena(args.board_size, capacity=args.snakes, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+    for _ in range(args.snakes):
+        arena.spawn()
+
+    tick_ms, naive_ms, lengths = [], [], []
+    naive_every = max(1, args.ticks // max(args.naive_ticks, 1))
+    for tick in range(args.ticks):
+        actions = bot_actions(arena, rng)
+        if args.naive_ticks and tick % naive_every == 0:
+            start = time.perf_counter()
+            naive_collisions(arena, actions)
+            naive_ms.append((time.perf_counter() - start) * 1000)
+            lengths.append(sum(len(arena.bodies[i]) for i in np.flatnonzero(arena.alive)))
+        start = time.perf_counter()
+        dead = arena.step(actions)
+        tick_ms.append((time.perf_counter() - start) * 1000)
+        for snake_id in dead.tolist():
+            arena.remove(snake_id)
+            arena.spawn()
+
+    tick_ms = np.array(tick_ms)
+    print(f"{args.snakes} snakes on {args.board_size}x{args.board_size}, {args.ticks} ticks, "
+          f"longest snake {max(len(body) for body in arena.bodies)}")
+    print(f"arena tick      p50 {np.percentile(tick_ms, 50):7.3f} ms  "
+          f"p95 {np.percentile(tick_ms, 95):7.3f} ms  ({1000 / tick_ms.mean():,.0f} ticks/s)")
+    if naive_ms:
+        print(f"naive collision p50 {np.percentile(naive_ms, 50):7.3f} ms  "
+              f"(total length {int(np.mean(lengths)):,} cells, collision check only)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Decisions/sec and average score of the snake autopilot.
+
+    python -m benchmarks.snake_autopilot --sizes 10 20 30 --games 5
+"""
+import argparse
+import time
+
+from snake_autopilot import Autopilot
+from snake_engine import SnakeGame
+
+
+def play(board_size, seed, max_ticks):
+    """Play one autopilot game; returns (score, decisions, replans)"""
+    game = SnakeGame(board_size, seed=seed)
+    pilot = Autopilot(board_size)
+    decisions = 0
+    while not game.game_over and decisions < max_ticks:
+        game.turn(pilot.choose(game))
+        game.step()
+        decisions += 1
+    return game.score, decisions, pilot.replans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 30])
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--max-ticks-per-cell", type=int, default=40,
+                        help="Stop a game after board_size^2 times this many ticks")
+    args = parser.parse_args()
+
+    print(f"{'board':>7} {'avg score':>10} {'decisions/sec':>14} {'replan %':>9}")
+    for size in args.sizes:
+        scores, decisions, replans = [], 0, 0
+        start = time.perf_counter()
+        for seed in range(args.games):
+            score, n, r = play(size, seed, size * size * args.max_ticks_per_cell)
+            scores.append(score)
+            decisions += n
+            replans += r
+        elapsed = time.perf_counter() - start
+        print(f"{size:>3}x{size:<3} {sum(scores) / len(scores):>10.0f} "
+              f"{decisions / elapsed:>14,.0f} {100 * replans / decisions:>8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
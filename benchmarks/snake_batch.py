@@ -0,0 +1,39 @@
+"""Throughput of the batched snake simulator.
+
+Run from the repository root:
+
+    python -m benchmarks.snake_batch --games 10000 --ticks 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from snake_engine import BatchSnakeSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--board-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    sim = BatchSnakeSimulator(args.games, args.board_size, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    stepped = 0
+    start = time.perf_counter()
+    for _ in range(args.ticks):
+        # Random policy; finished games are restarted so the batch stays full
+        stepped += sim.step(rng.integers(0, 4, size=args.games, dtype=np.int8))
+        sim.reset(np.flatnonzero(~sim.alive))
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.games} games x {args.ticks} ticks on {args.board_size}x{args.board_size}")
+    print(f"{stepped} games stepped in {elapsed:.2f}s -> {stepped / elapsed:,.0f} games stepped/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Write throughput and query latency of the SQLite leaderboard.
+
+Fills a fresh database with ``--games`` results through the batching writer,
+then times the top-N and personal-best queries, uncached and cached.
+
+    python -m benchmarks.snake_leaderboard --games 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from snake_leaderboard import Leaderboard
+
+BOARDS = [(10, "open"), (20, "open"), (20, "rooms"), (30, "pillars"), (50, "obstacles")]
+
+
+def timed(function, repeat):
+    """Average milliseconds per call of ``function``"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=1_000_000)
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        board = Leaderboard(os.path.join(directory, "scores.db"))
+        start = time.perf_counter()
+        for _ in range(args.games):
+            size, level = rng.choice(BOARDS)
+            score = int(rng.expovariate(1 / 200)) // 10 * 10
+            board.submit_rows([(f"player{rng.randrange(args.players)}", score, 3 + score // 10,
+                                size, level, rng.randrange(2**63), time.time())])
+        queued = time.perf_counter() - start
+        board.flush()
+        written = time.perf_counter() - start
+        print(f"{args.games:,} games: queued in {queued:.2f}s, committed in {written:.2f}s "
+              f"({args.games / written:,.0f} games/s, {board.version} batches)")
+
+        def uncached(query):
+            # A new version empties the cache, as a committed batch would
+            def run():
+                board.version += 1
+                query()
+            return run
+
+        top = lambda: board.top(20, "open", 10)
+        best = lambda: board.personal_best("player42", 20, "open")
+        print(f"{'query':<14} {'uncached ms':>12} {'cached ms':>10}")
+        for name, query in (("top 10", top), ("personal best", best)):
+            print(f"{name:<14} {timed(uncached(query), args.repeat):>12.3f} "
+                  f"{timed(query, args.repeat):>10.4f}")
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
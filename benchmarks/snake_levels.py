@@ -0,0 +1,91 @@
+"""Cost of reachable food placement on a level, incremental vs flood fill.
+
+Plays autopilot games on the "obstacles" level and times every food
+placement and the rest of each tick (where ``LevelGame`` keeps its region
+labels up to date), for ``LevelGame`` and for a baseline that flood-fills
+from the head on every placement. The autopilot's own time is not counted.
+
+    python -m benchmarks.snake_levels --board-size 200 --ticks 5000
+"""
+import argparse
+import time
+
+from snake_autopilot import Autopilot
+from snake_engine import SnakeGame
+from snake_levels import LevelGame, level_walls
+
+
+class FloodFillGame(SnakeGame):
+    """Baseline: flood-fills the head's region for every food placement"""
+
+    def __init__(self, board_size, seed=None, level="obstacles"):
+        self.level = level
+        super().__init__(board_size, seed=seed, walls=level_walls(level, board_size, seed))
+
+    def generate_food(self):
+        if not self.free.cells:
+            return None
+        size = self.board_size
+        head = self.snake[0]
+        seen = set()
+        stack = [head[1] * size + head[0]]
+        while stack:
+            index = stack.pop()
+            x, y = index % size, index // size
+            for nxt, inside in ((index - size, y > 0), (index + size, y < size - 1),
+                                (index - 1, x > 0), (index + 1, x < size - 1)):
+                if inside and nxt not in seen and not self.occupied[nxt]:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        if not seen:
+            return super().generate_food()
+        cells = sorted(seen)
+        index = cells[self.rng.randrange(len(cells))]
+        return (index % size, index // size)
+
+
+def run(game_class, board_size, ticks):
+    """Play until ``ticks`` moves are made; returns (tick seconds, placements, placement seconds)"""
+    placements, placement_seconds, tick_seconds = 0, 0.0, 0.0
+    seed = 0
+    while ticks > 0:
+        game = game_class(board_size, seed=seed, level="obstacles")
+        seed += 1
+        generate = game.generate_food
+
+        def timed_generate():
+            nonlocal placements, placement_seconds
+            start = time.perf_counter()
+            food = generate()
+            placement_seconds += time.perf_counter() - start
+            placements += 1
+            return food
+
+        game.generate_food = timed_generate
+        policy = Autopilot(board_size)
+        while not game.game_over and ticks > 0:
+            game.turn(policy.choose(game))
+            start = time.perf_counter()
+            game.step()
+            tick_seconds += time.perf_counter() - start
+            ticks -= 1
+    return tick_seconds - placement_seconds, placements, placement_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--board-size", type=int, default=200)
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{args.ticks} autopilot ticks on {args.board_size}x{args.board_size} obstacles")
+    print(f"{'placement':<12} {'placements':>10} {'us/placement':>13} {'us/tick':>8} {'us/tick total':>14}")
+    for name, game_class in (("incremental", LevelGame), ("flood fill", FloodFillGame)):
+        tick_seconds, placements, placement_seconds = run(game_class, args.board_size, args.ticks)
+        print(f"{name:<12} {placements:>10} {placement_seconds / max(placements, 1) * 1e6:>13,.0f} "
+              f"{tick_seconds / args.ticks * 1e6:>8.1f} "
+              f"{(tick_seconds + placement_seconds) / args.ticks * 1e6:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Load generator for the snake game server.
+
+Spins up N simulated players as asyncio tasks against an in-process
+GameServer. Every tick each player reads its own game state, sometimes
+turns, and restarts when it dies. Reports tick cost, achieved tick rate and
+how long players waited to see each tick.
+
+    python -m benchmarks.snake_load --players 5000 --seconds 10
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from snake_engine import DIRECTION_NAMES
+from snake_server import GameServer
+
+
+async def player(server, seed, latencies, stop):
+    rng = random.Random(seed)
+    game_id = server.join()
+    while not stop.is_set():
+        await server.wait_tick()
+        tick_time = server.tick_times[-1]
+        latencies.append(time.perf_counter() - tick_time)
+        state = server.state(game_id)
+        if state.game_over:
+            server.restart(game_id)
+        elif rng.random() < 0.2:
+            server.send_input(game_id, rng.choice(DIRECTION_NAMES))
+    server.leave(game_id)
+
+
+async def run(args):
+    server = GameServer(capacity=args.players, board_size=args.board_size,
+                        tick_interval=args.tick_ms / 1000, seed=args.seed)
+    loop_task = asyncio.create_task(server.run())
+    await asyncio.sleep(0)  # Let the loop create its first tick future
+
+    stop = asyncio.Event()
+    latencies = []
+    players = [asyncio.create_task(player(server, args.seed + i, latencies, stop))
+               for i in range(args.players)]
+    await asyncio.sleep(args.seconds)
+    stats = server.stats()
+    stop.set()
+    await asyncio.gather(*players)
+    server.stop()
+    await loop_task
+
+    latencies = np.array(latencies) * 1000
+    print(f"{args.players} players on {args.board_size}x{args.board_size}, "
+          f"target {1000 / args.tick_ms:.0f} ticks/sec for {args.seconds}s")
+    print(f"achieved {stats['ticks_per_sec']:.1f} ticks/sec over {stats['ticks']} ticks")
+    print(f"tick cost p50 {stats['tick_ms_p50']:.2f} ms, p99 {stats['tick_ms_p99']:.2f} ms")
+    print(f"player update latency p50 {np.percentile(latencies, 50):.1f} ms, "
+          f"p99 {np.percentile(latencies, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--tick-ms", type=float, default=100)
+    parser.add_argument("--board-size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Per-move cost of SnakeGame.step as the snake grows.
+
+Loads a serpentine body of each length onto a large board and times straight
+moves into the empty part of the board. The deque + occupancy grid engine
+should stay flat; the old list-based move (``in`` scan, ``insert(0)``,
+``pop()``) is timed alongside for comparison.
+
+    python -m benchmarks.snake_moves --lengths 10 100 1000 10000 40000
+"""
+import argparse
+import time
+
+from snake_engine import SnakeGame
+
+
+def serpentine(length, width):
+    """Head-first body filling rows left-to-right, right-to-left, ..."""
+    cells = []
+    for i in range(length):
+        row, col = divmod(i, width)
+        x = col if row % 2 == 0 else width - 1 - col
+        cells.append((x, row))
+    return cells[::-1]
+
+
+def time_engine(body, board_size, moves):
+    game = SnakeGame(board_size)
+    game.set_body(body, "DOWN")
+    # No food on the board, so the length stays fixed
+    game.food = None
+    start = time.perf_counter()
+    for _ in range(moves):
+        game.step()
+    elapsed = time.perf_counter() - start
+    assert not game.game_over
+    return elapsed / moves
+
+
+def time_list(body, moves):
+    snake = list(body)
+    start = time.perf_counter()
+    for _ in range(moves):
+        head = snake[0]
+        new_head = (head[0], head[1] + 1)
+        if new_head in snake:
+            raise AssertionError("unexpected collision")
+        snake.insert(0, new_head)
+        snake.pop()
+    return (time.perf_counter() - start) / moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 100, 1000, 10000, 40000])
+    parser.add_argument("--board-size", type=int, default=256)
+    parser.add_argument("--moves", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'length':>8} {'engine us/move':>15} {'list us/move':>13}")
+    for length in args.lengths:
+        body = serpentine(length, args.board_size)
+        rows_used = body[0][1] + 1
+        moves = min(args.moves, args.board_size - rows_used)
+        if moves <= 0:
+            print(f"{length:>8} does not fit on a {args.board_size}x{args.board_size} board")
+            continue
+        engine = time_engine(body, args.board_size, moves)
+        legacy = time_list(body, moves)
+        print(f"{length:>8} {engine * 1e6:>15.2f} {legacy * 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Downsampling for long time-series charts, so the browser gets about one point per pixel.
+
+A Plotly line chart ships every point to the browser as JSON, however many
+of them land on the same pixel column. ``downsample`` cuts the x range into
+buckets of two pixels each and keeps the lowest and the highest point of every
+bucket (plus the first and last point), all in vectorized NumPy: a drawn
+line looks the same, spikes included, with a few thousand points rather than
+millions. Traces of long series go to the browser as WebGL (``Scattergl`` /
+``render_mode="webgl"``) instead of SVG; that is decided on the series'
+length before downsampling, since a downsampled trace never gets much past
+``CHART_WIDTH`` points, however long the history.
+
+Streamlit doesn't report Plotly's zoom back to the app, but it does report
+box selections: ``selected_range`` reads the x range of one, so a page can
+re-query just that range and downsample it again at the finer resolution.
+
+    python -m benchmarks.chart_sampling --points 1000000
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+CHART_WIDTH = 1000   # Pixels a full-width chart is assumed to span
+WEBGL_POINTS = 1000  # Series with more points than this (before downsampling) are drawn with WebGL
+
+
+def _positions(values):
+    """``values`` (numbers, dates or datetimes) as floats that keep their order and spacing"""
+    values = pd.Series(values)
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_datetime(values).astype('int64')
+    return values.to_numpy(dtype=np.float64)
+
+
+def minmax_indices(x, y, buckets):
+    """Sorted indices of the first and last point and of the min and max ``y`` in each
+    of ``buckets`` equal ranges of ``x`` (sorted ascending)"""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 2 * buckets + 2:
+        return np.arange(n)
+    starts = np.searchsorted(x, np.linspace(x[0], x[-1], buckets + 1)[:-1], side='left')
+    starts = starts[np.concatenate(([True], starts[1:] != starts[:-1]))]
+    bucket = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, n)))
+    position = np.arange(n)
+    keep = [[0, n - 1]]
+    for extreme in (np.fmin, np.fmax):
+        value = extreme.reduceat(y, starts)
+        # First index in each bucket holding its extreme (NaNs are skipped)
+        keep.append(np.minimum.reduceat(np.where(y == value[bucket], position, n), starts))
+    keep = np.sort(np.concatenate(keep))
+    keep = keep[np.concatenate(([True], keep[1:] != keep[:-1]))]
+    return keep[keep < n]
+
+
+def downsample(frame, x, columns, width=CHART_WIDTH):
+    """Rows of ``frame`` (sorted by ``x``) keeping each of ``columns``' extremes per two
+    pixels of a chart ``width`` pixels wide; small frames come back unchanged"""
+    buckets = max(width // 2, 1)
+    if len(frame) <= 2 * buckets + 2:
+        return frame
+    x = _positions(frame[x])
+    keep = np.unique(np.concatenate([minmax_indices(x, frame[column], buckets) for column in columns]))
+    return frame.iloc[keep]
+
+
+def render_mode(points):
+    """``render_mode`` for plotly express of a series of ``points`` points (before downsampling)"""
+    return 'webgl' if points > WEBGL_POINTS else 'svg'
+
+
+def scatter_trace(points, **kwargs):
+    """A ``go.Scattergl`` for a series of more than WEBGL_POINTS points (before downsampling),
+    else a ``go.Scatter``"""
+    return (go.Scattergl if points > WEBGL_POINTS else go.Scatter)(**kwargs)
+
+
+def selected_range(state):
+    """(start, end) x range of the box selected in a chart's selection ``state``, or None.
+
+    ``state`` is what ``st.plotly_chart(..., on_select="rerun", key=...)``
+    keeps in ``st.session_state[key]``; date axes give strings, which pandas parses.
+    """
+    if not state:
+        return None
+    boxes = state.get('selection', {}).get('box') or []
+    if not boxes or len(boxes[0].get('x', ())) != 2:
+        return None
+    start, end = sorted(boxes[0]['x'])
+    return start, end
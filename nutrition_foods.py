@@ -0,0 +1,224 @@
+"""Food database of the nutrition tracker, stored as memory-mapped columns.
+
+A food table (CSV or JSON, one row per food with a name and its nutrients
+per serving) is converted once into a directory of flat files:
+
+* one ``<nutrient>.npy`` float64 array per nutrient column;
+* ``names.npy`` (all names as one UTF-8 byte array) and ``name_offsets.npy``
+  (where each name starts), so name ``i`` is one slice;
+* ``name_order.npy``, the ids sorted by name, for binary-search lookups,
+  and ``<nutrient>_order.npy``, the ids sorted by each nutrient, so the Food
+  Database page sorts by masking a ready permutation instead of sorting;
+* ``meta.json`` with the nutrient columns and the number of foods.
+
+``FoodDatabase`` opens the arrays with ``np.load(mmap_mode="r")``: opening
+costs the same for 24 foods or 500k, pages are read on first use, and every
+process opening the directory shares them through the OS page cache. It is
+a read-only mapping of name -> nutrients, like the dict it replaces.
+
+    python nutrition_foods.py foods.csv --out food_db
+"""
+import argparse
+import json
+import os
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from nutrition_log import NUTRIENTS
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "food_db")
+
+# The starter foods written to DEFAULT_DIR when no database has been built yet
+BUILTIN_FOODS = {
+    # Fruits
+    'Apple (medium)': {'calories': 95, 'protein': 0.5, 'carbs': 25, 'fat': 0.3, 'fiber': 4},
+    'Banana (medium)': {'calories': 105, 'protein': 1.3, 'carbs': 27, 'fat': 0.4, 'fiber': 3},
+    'Orange (medium)': {'calories': 80, 'protein': 2, 'carbs': 19, 'fat': 0.2, 'fiber': 3},
+    'Avocado (half)': {'calories': 160, 'protein': 2, 'carbs': 9, 'fat': 15, 'fiber': 7},
+    'Berries (1 cup)': {'calories': 85, 'protein': 1, 'carbs': 21, 'fat': 0.5, 'fiber': 8},
+
+    # Vegetables
+    'Broccoli (1 cup)': {'calories': 55, 'protein': 4, 'carbs': 11, 'fat': 0.6, 'fiber': 5},
+    'Spinach (1 cup)': {'calories': 7, 'protein': 1, 'carbs': 1, 'fat': 0.1, 'fiber': 1},
+    'Carrots (1 cup)': {'calories': 50, 'protein': 1, 'carbs': 12, 'fat': 0.3, 'fiber': 4},
+    'Sweet Potato (medium)': {'calories': 115, 'protein': 2, 'carbs': 27, 'fat': 0.1, 'fiber': 4},
+
+    # Proteins
+    'Chicken Breast (100g)': {'calories': 165, 'protein': 31, 'carbs': 0, 'fat': 3.6, 'fiber': 0},
+    'Salmon (100g)': {'calories': 208, 'protein': 20, 'carbs': 0, 'fat': 13, 'fiber': 0},
+    'Eggs (2 large)': {'calories': 140, 'protein': 12, 'carbs': 1, 'fat': 10, 'fiber': 0},
+    'Greek Yogurt (1 cup)': {'calories': 130, 'protein': 20, 'carbs': 9, 'fat': 0, 'fiber': 0},
+    'Lentils (1 cup cooked)': {'calories': 230, 'protein': 18, 'carbs': 40, 'fat': 1, 'fiber': 16},
+    'Tofu (100g)': {'calories': 76, 'protein': 8, 'carbs': 2, 'fat': 4.8, 'fiber': 1},
+
+    # Grains & Carbs
+    'Brown Rice (1 cup cooked)': {'calories': 220, 'protein': 5, 'carbs': 45, 'fat': 2, 'fiber': 4},
+    'Quinoa (1 cup cooked)': {'calories': 220, 'protein': 8, 'carbs': 39, 'fat': 4, 'fiber': 5},
+    'Oats (1 cup cooked)': {'calories': 150, 'protein': 5, 'carbs': 27, 'fat': 3, 'fiber': 4},
+    'Whole Wheat Bread (2 slices)': {'calories': 160, 'protein': 8, 'carbs': 28, 'fat': 2, 'fiber': 6},
+
+    # Nuts & Seeds
+    'Almonds (28g/23 nuts)': {'calories': 160, 'protein': 6, 'carbs': 6, 'fat': 14, 'fiber': 3},
+    'Walnuts (28g/14 halves)': {'calories': 185, 'protein': 4, 'carbs': 4, 'fat': 18, 'fiber': 2},
+    'Chia Seeds (1 tbsp)': {'calories': 60, 'protein': 2, 'carbs': 5, 'fat': 4, 'fiber': 5},
+
+    # Dairy
+    'Milk (1 cup)': {'calories': 150, 'protein': 8, 'carbs': 12, 'fat': 8, 'fiber': 0},
+    'Cheese (28g)': {'calories': 110, 'protein': 7, 'carbs': 1, 'fat': 9, 'fiber': 0},
+}
+
+
+def read_food_table(path, name_column='name'):
+    """DataFrame of a CSV or JSON food table, with the names in ``name_column``.
+
+    JSON can be a list of rows or an object of name -> nutrients (the shape
+    of BUILTIN_FOODS).
+    """
+    if path.lower().endswith('.json'):
+        with open(path) as file:
+            data = json.load(file)
+        if isinstance(data, dict):
+            return pd.DataFrame.from_dict(data, orient='index').rename_axis(name_column).reset_index()
+        return pd.DataFrame(data)
+    return pd.read_csv(path)
+
+
+def build_food_db(table, directory=DEFAULT_DIR, name_column='name'):
+    """Write ``table`` (a DataFrame) as a columnar food database in ``directory``.
+
+    Every numeric column besides the names becomes a nutrient; the NUTRIENTS
+    the app logs must be among them. Later rows with an already seen name
+    are dropped.
+    """
+    table = table.drop_duplicates(subset=name_column)
+    nutrients = [column for column in table.columns
+                 if column != name_column and pd.api.types.is_numeric_dtype(table[column])]
+    missing = [nutrient for nutrient in NUTRIENTS if nutrient not in nutrients]
+    if missing:
+        raise ValueError(f"Food table has no {', '.join(missing)} column(s)")
+
+    os.makedirs(directory, exist_ok=True)
+    if os.path.exists(os.path.join(directory, 'meta.json')):
+        os.remove(os.path.join(directory, 'meta.json'))
+    names = table[name_column].astype(str).tolist()
+    encoded = [name.encode('utf-8') for name in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(name) for name in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, 'names.npy'), np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, 'name_offsets.npy'), offsets)
+    np.save(os.path.join(directory, 'name_order.npy'),
+            np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.int64))
+    for nutrient in nutrients:
+        values = table[nutrient].fillna(0).to_numpy(dtype=np.float64)
+        np.save(os.path.join(directory, f'{nutrient}.npy'), values)
+        np.save(os.path.join(directory, f'{nutrient}_order.npy'), np.argsort(values, kind='stable'))
+    # meta.json goes last: a directory without it is an unfinished build
+    with open(os.path.join(directory, 'meta.json'), 'w') as file:
+        json.dump({'foods': len(names), 'nutrients': nutrients}, file)
+
+
+class FoodDatabase(Mapping):
+    """Read-only mapping of food name -> {nutrient: value} over memory-mapped columns"""
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as file:
+            meta = json.load(file)
+        self.size = meta['foods']
+        self.nutrients = meta['nutrients']
+
+        def load(name):
+            return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+        self.name_bytes = load('names')
+        self.name_offsets = load('name_offsets')
+        self.name_order = load('name_order')
+        self.columns = {nutrient: load(nutrient) for nutrient in self.nutrients}
+        self.orders = {'name': self.name_order}
+        self._names = None
+
+    def name(self, food_id):
+        start, stop = self.name_offsets[food_id], self.name_offsets[food_id + 1]
+        return self.name_bytes[start:stop].tobytes().decode('utf-8')
+
+    def names(self):
+        """Every name in id order (decoded once, on first use)"""
+        if self._names is None:
+            data, offsets = self.name_bytes.tobytes(), self.name_offsets.tolist()
+            self._names = [data[start:stop].decode('utf-8') for start, stop in zip(offsets, offsets[1:])]
+        return self._names
+
+    def id_of(self, name):
+        """Id of the food called ``name``, by binary search over the sorted names"""
+        lo, hi = 0, self.size
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if self.name(self.name_order[middle]) < name:
+                lo = middle + 1
+            else:
+                hi = middle
+        if lo < self.size and self.name(self.name_order[lo]) == name:
+            return int(self.name_order[lo])
+        raise KeyError(name)
+
+    def column(self, nutrient):
+        """All foods' values of ``nutrient``, indexed by id (memory-mapped, read-only)"""
+        return self.columns[nutrient]
+
+    def sort_order(self, key):
+        """All ids sorted by ``key`` ('name' or a nutrient), ascending"""
+        if key not in self.orders:
+            self.orders[key] = np.load(os.path.join(self.directory, f'{key}_order.npy'), mmap_mode='r')
+        return self.orders[key]
+
+    def select(self, mask=None, sort_by='name', ascending=True):
+        """Ids where the boolean ``mask`` (indexed by id) is True, sorted by ``sort_by``"""
+        order = self.sort_order(sort_by)
+        if not ascending:
+            order = order[::-1]
+        return np.asarray(order) if mask is None else order[mask[order]]
+
+    def nutrition(self, food_id):
+        return {nutrient: float(column[food_id]) for nutrient, column in self.columns.items()}
+
+    def __getitem__(self, name):
+        return self.nutrition(self.id_of(name))
+
+    def __contains__(self, name):
+        try:
+            self.id_of(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return self.size
+
+
+def open_food_db(directory=DEFAULT_DIR):
+    """The database in ``directory``, first writing BUILTIN_FOODS there if it has none"""
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        table = pd.DataFrame.from_dict(BUILTIN_FOODS, orient='index').rename_axis('name').reset_index()
+        build_food_db(table, directory)
+    return FoodDatabase(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a CSV/JSON food table into a columnar food database")
+    parser.add_argument("source", help="CSV or JSON file, one row per food")
+    parser.add_argument("--out", default=DEFAULT_DIR, help="Directory to write the database to")
+    parser.add_argument("--name-column", default="name")
+    args = parser.parse_args()
+
+    table = read_food_table(args.source, args.name_column)
+    build_food_db(table, args.out, args.name_column)
+    print(f"Wrote {len(FoodDatabase(args.out)):,} foods to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Food log for the nutrition tracker, stored column by column and sorted by date.
+
+Instead of one dict per entry, the log keeps NumPy columns: the date, an
+index into a table of distinct food names, and a row of NUTRIENTS: 52 bytes
+per entry rather than ~500 for a dict of Python objects. The columns are
+over-allocated and doubled when full, so appending stays amortized O(1) (at
+the price of up to as much again in spare capacity).
+
+Rows are kept sorted by date, which makes a day (or a date range) one
+contiguous slice found by binary search:
+
+* the Dashboard and sidebar read only today's rows, next to running totals
+  per day that appends add to (a removal re-sums just its day, so repeated
+  edits never accumulate float drift);
+* ``frame`` hands the analysis pages a DataFrame over a slice of the columns
+  without copying them.
+
+Entries dated before the last row and removals rebuild the columns (O(n),
+but rare), and never write into arrays a previous ``frame`` still views.
+
+``DailyTotals`` is the same idea one level up: one row of totals per day,
+which is all Progress Analysis charts and summarizes, so its cost follows
+the number of days rather than the number of entries.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fat', 'fiber')
+
+
+def _day_key(day):
+    # Seconds resolution is what pandas keeps natively, so frames don't convert
+    return np.datetime64(day, 's')
+
+
+def _to_date(key):
+    return key.astype('datetime64[D]').item()
+
+
+class FoodLog:
+    """Food log entries (dicts with a ``date``, ``food`` and the NUTRIENTS) in columns"""
+
+    def __init__(self, entries=(), capacity=1024):
+        self.dates = np.empty(capacity, dtype='datetime64[s]')
+        self.food_ids = np.empty(capacity, dtype=np.int32)
+        self.values = np.empty((capacity, len(NUTRIENTS)), dtype=np.float64)
+        self.foods = []       # Distinct food names, indexed by food_ids
+        self.food_index = {}  # Food name -> its index in foods
+        self.totals = {}      # date -> running NUTRIENTS totals of that day
+        self.size = 0
+        for entry in entries:
+            self.append(entry)
+
+    # ------------------------------------------------------------------
+    # Changes
+    # ------------------------------------------------------------------
+    def append(self, entry):
+        day = entry['date']
+        key = _day_key(day)
+        food_id = self.food_index.get(entry['food'])
+        if food_id is None:
+            food_id = self.food_index[entry['food']] = len(self.foods)
+            self.foods.append(entry['food'])
+        row = [entry.get(nutrient, 0) for nutrient in NUTRIENTS]
+
+        n = self.size
+        if n == 0 or key >= self.dates[n - 1]:
+            if n == len(self.dates):
+                self._grow(2 * n)
+            self.dates[n] = key
+            self.food_ids[n] = food_id
+            self.values[n] = row
+        else:
+            # Back-dated entry: rebuild the columns with the row in place
+            at = int(np.searchsorted(self.dates[:n], key, side='right'))
+            self.dates = np.insert(self.dates, at, key)
+            self.food_ids = np.insert(self.food_ids, at, food_id)
+            self.values = np.insert(self.values, at, row, axis=0)
+        self.size += 1
+
+        totals = self.totals.get(day)
+        if totals is None:
+            totals = self.totals[day] = np.zeros(len(NUTRIENTS))
+        totals += row
+
+    def remove(self, entry):
+        """Remove one entry equal to ``entry``; raises ValueError if there is none"""
+        day = entry['date']
+        start, stop = self._rows(day)
+        food_id = self.food_index.get(entry['food'], -1)
+        row = np.array([entry.get(nutrient, 0) for nutrient in NUTRIENTS], dtype=np.float64)
+        matches = np.flatnonzero((self.food_ids[start:stop] == food_id)
+                                 & (self.values[start:stop] == row).all(axis=1))
+        if matches.size == 0:
+            raise ValueError(f"{entry['food']!r} is not logged on {day}")
+        at = start + int(matches[0])
+        self.dates = np.delete(self.dates, at)
+        self.food_ids = np.delete(self.food_ids, at)
+        self.values = np.delete(self.values, at, axis=0)
+        self.size -= 1
+        if stop - start == 1:
+            del self.totals[day]
+        else:
+            self.totals[day] = self.values[start:stop - 1].sum(axis=0)
+
+    def _grow(self, capacity):
+        capacity = max(capacity, 16)
+        for name in ('dates', 'food_ids', 'values'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _rows(self, first, last=None):
+        """Row range (start, stop) of the entries from ``first`` to ``last`` inclusive"""
+        dates = self.dates[:self.size]
+        start = int(np.searchsorted(dates, _day_key(first), side='left'))
+        stop = int(np.searchsorted(dates, _day_key(first if last is None else last), side='right'))
+        return start, stop
+
+    def entries_on(self, day):
+        """Entries logged on ``day`` as dicts, in the order they were added"""
+        return self.entries(day, day)
+
+    def count_on(self, day):
+        start, stop = self._rows(day)
+        return stop - start
+
+    def totals_on(self, day):
+        """Nutrient totals of ``day`` (zeros if nothing was logged)"""
+        totals = self.totals.get(day)
+        if totals is None:
+            return {nutrient: 0 for nutrient in NUTRIENTS}
+        return dict(zip(NUTRIENTS, totals.tolist()))
+
+    def today(self):
+        """Today's totals and entries, as the Dashboard shows them"""
+        today = date.today()
+        return self.totals_on(today), self.entries_on(today)
+
+    def first_day(self):
+        return _to_date(self.dates[0]) if self.size else None
+
+    def last_day(self):
+        return _to_date(self.dates[self.size - 1]) if self.size else None
+
+    def frame(self, first=None, last=None, foods=False):
+        """DataFrame of ``date`` and the NUTRIENTS from ``first`` to ``last`` (inclusive).
+
+        The columns are views of the log's arrays, not copies; later changes
+        to the log never show up in a frame already handed out. ``foods``
+        adds the food names as a categorical column (built from the ids).
+        """
+        start, stop = self._rows(first or date.min, last or date.max)
+        frame = pd.DataFrame(self.values[start:stop], columns=list(NUTRIENTS), copy=False)
+        frame.insert(0, 'date', pd.Series(self.dates[start:stop], copy=False))
+        if foods:
+            frame.insert(1, 'food', pd.Categorical.from_codes(self.food_ids[start:stop],
+                                                              categories=self.foods))
+        return frame
+
+    def daily_totals(self):
+        """DailyTotals of every day in the log"""
+        days = sorted(self.totals)
+        keys = np.array([_day_key(day) for day in days], dtype='datetime64[s]')
+        dates = self.dates[:self.size]
+        counts = np.searchsorted(dates, keys, side='right') - np.searchsorted(dates, keys, side='left')
+        totals = np.array([self.totals[day] for day in days]).reshape(len(days), len(NUTRIENTS))
+        return DailyTotals(keys, counts, totals)
+
+    def entries(self, first=None, last=None):
+        """Entries from ``first`` to ``last`` (inclusive, default all) as dicts, oldest first"""
+        start, stop = self._rows(first or date.min, last or date.max)
+        foods = self.foods
+        return [dict(date=day, food=foods[food_id], **dict(zip(NUTRIENTS, row)))
+                for day, food_id, row in zip(self.dates[start:stop].astype('datetime64[D]').tolist(),
+                                             self.food_ids[start:stop].tolist(),
+                                             self.values[start:stop].tolist())]
+
+    def __len__(self):
+        return self.size
+
+
+class DailyTotals:
+    """Entry count and NUTRIENTS totals per logged day, sorted by day.
+
+    Appends and removals change only their day's row; they replace the
+    arrays rather than write into them, so frames handed out stay as they were.
+    """
+
+    def __init__(self, days=None, counts=None, totals=None):
+        self.days = np.empty(0, dtype='datetime64[s]') if days is None else np.asarray(days, dtype='datetime64[s]')
+        self.counts = np.zeros(len(self.days), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self.totals = (np.zeros((len(self.days), len(NUTRIENTS))) if totals is None
+                       else np.asarray(totals, dtype=np.float64).reshape(len(self.days), len(NUTRIENTS)))
+
+    def append(self, entry):
+        self._add(entry, 1)
+
+    def remove(self, entry):
+        self._add(entry, -1)
+
+    def _add(self, entry, sign):
+        key = _day_key(entry['date'])
+        row = sign * np.array([entry.get(nutrient, 0) for nutrient in NUTRIENTS], dtype=np.float64)
+        at = int(np.searchsorted(self.days, key))
+        if at == len(self.days) or self.days[at] != key:
+            if sign < 0:
+                raise ValueError(f"Nothing is logged on {entry['date']}")
+            self.days = np.insert(self.days, at, key)
+            self.counts = np.insert(self.counts, at, 1)
+            self.totals = np.insert(self.totals, at, row, axis=0)
+        elif self.counts[at] + sign == 0:
+            self.days = np.delete(self.days, at)
+            self.counts = np.delete(self.counts, at)
+            self.totals = np.delete(self.totals, at, axis=0)
+        else:
+            self.counts = self.counts.copy()
+            self.counts[at] += sign
+            self.totals = self.totals.copy()
+            self.totals[at] += row
+
+    def frame(self, first=None, last=None):
+        """DataFrame of ``date``, ``entries`` and the NUTRIENTS totals of each logged day
+        from ``first`` to ``last`` (inclusive), over views of the arrays"""
+        start = int(np.searchsorted(self.days, _day_key(first or date.min), side='left'))
+        stop = int(np.searchsorted(self.days, _day_key(last or date.max), side='right'))
+        frame = pd.DataFrame(self.totals[start:stop], columns=list(NUTRIENTS), copy=False)
+        frame.insert(0, 'date', pd.Series(self.days[start:stop], copy=False))
+        frame.insert(1, 'entries', pd.Series(self.counts[start:stop], copy=False))
+        return frame
+
+    def __len__(self):
+        return len(self.days)
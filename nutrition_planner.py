@@ -0,0 +1,172 @@
+"""Meal plans picked from the food database to hit the daily nutrient goals.
+
+``plan_meals`` fills ``days`` x ``meals`` x ``foods_per_meal`` slots with a
+food and a serving multiplier each. It is a local search, vectorized with
+NumPy rather than solved as an LP (which would need a solver dependency):
+
+* Each restart draws a random pool of foods (``pool_size``, a few thousand,
+  however big the database is) and fills the slots at random.
+* A sweep visits the slots one by one and swaps in the best food and serving
+  of the whole pool, scored for every day at once as one array of
+  ``days x pool x servings`` candidate totals. Sweeps repeat until none
+  improves the plan.
+* Restarts go on until ``time_budget`` seconds are used up; each day keeps
+  the best plan any restart found for it. The first restart always gets two
+  sweeps, which is most of the gain, so a tight budget still gives a fair plan.
+
+A plan scores the squared relative error of each day's totals against the
+goals (fiber only counts when short), plus how far each meal's calories are
+from an even share of the day, plus a small penalty for foods repeated on
+other days. A food is never used twice in one day.
+
+    python -m benchmarks.nutrition_planner --foods 100000 --days 7
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from nutrition_log import NUTRIENTS
+
+SERVINGS = (0.5, 1.0, 1.5, 2.0)
+MINIMUM_ONLY = ('fiber',)  # Goals that are only missed when short
+MEAL_BALANCE = 0.1         # Weight of each meal's calories against an even share of the day
+REPEAT_PENALTY = 0.002     # Added per other day that uses the same food
+MAX_SWEEPS = 50            # Per restart, in case days keep trading foods
+FIRST_SWEEPS = 2           # Sweeps the first restart makes whatever the budget (most of the gain)
+
+
+class MealPlan:
+    """Foods and servings of every day, meal and slot, with what they add up to"""
+
+    def __init__(self, database, food_ids, servings, goals):
+        self.database = database
+        self.food_ids = food_ids  # (days, meals, foods per meal) ids into database
+        self.servings = servings  # Same shape, serving multipliers
+        self.goals = goals
+        rows = np.column_stack([np.asarray(database.column(n))[food_ids.ravel()] for n in NUTRIENTS])
+        self.values = rows.reshape(food_ids.shape + (len(NUTRIENTS),)) * servings[..., None]
+
+    @property
+    def days(self):
+        return self.food_ids.shape[0]
+
+    def frame(self):
+        """DataFrame with one row per food: day, meal, food, servings and its NUTRIENTS"""
+        days, meals, slots = np.indices(self.food_ids.shape)
+        frame = pd.DataFrame({
+            'day': days.ravel() + 1,
+            'meal': meals.ravel() + 1,
+            'food': [self.database.name(i) for i in self.food_ids.ravel().tolist()],
+            'servings': self.servings.ravel(),
+        })
+        for i, nutrient in enumerate(NUTRIENTS):
+            frame[nutrient] = self.values[..., i].ravel()
+        return frame
+
+    def totals(self):
+        """DataFrame of each day's NUTRIENTS totals"""
+        frame = pd.DataFrame(self.values.sum(axis=(1, 2)), columns=list(NUTRIENTS))
+        frame.insert(0, 'day', np.arange(1, self.days + 1))
+        return frame
+
+
+def _errors(totals, goals, weights):
+    """Squared relative error of ``totals`` (..., NUTRIENTS) against ``goals``"""
+    relative = (totals - goals) / goals
+    relative = np.where(weights['minimum_only'], np.minimum(relative, 0), relative)
+    return (relative ** 2 * weights['nutrients']).sum(axis=-1)
+
+
+def plan_meals(database, goals, days=1, meals=3, foods_per_meal=3, time_budget=0.5,
+               pool_size=4000, seed=None):
+    """MealPlan of ``days`` days of ``meals`` meals, best found in ``time_budget`` seconds.
+
+    ``goals`` maps NUTRIENTS to daily targets (others, like water, are
+    ignored, as are nutrients with no positive goal). ``database`` is a
+    FoodDatabase, or anything with ``column(nutrient)``, ``name(id)`` and ``len``.
+    """
+    deadline = time.perf_counter() + time_budget
+    rng = np.random.default_rng(seed)
+    target = np.array([float(goals.get(nutrient, 0)) for nutrient in NUTRIENTS])
+    weights = {'nutrients': (target > 0).astype(float),
+               'minimum_only': np.array([nutrient in MINIMUM_ONLY for nutrient in NUTRIENTS])}
+    target = np.where(target > 0, target, 1.0)
+    two_sided = weights['nutrients'] * ~weights['minimum_only']
+    one_sided = weights['nutrients'] * weights['minimum_only']
+    meal_target = target[0] / meals
+    servings = np.array(SERVINGS)
+    slots = meals * foods_per_meal
+    if len(database) < slots:
+        raise ValueError(f"A day of {slots} foods needs at least that many foods in the database")
+
+    best_error = np.full(days, np.inf)
+    best_ids = np.zeros((days, slots), dtype=np.int64)
+    best_servings = np.ones((days, slots))
+    day_index = np.arange(days)
+    while True:
+        # A pool of usable foods (known, non-negative values and some calories)
+        pool = np.sort(rng.choice(len(database), size=min(pool_size, len(database)), replace=False))
+        values = np.column_stack([np.asarray(database.column(n))[pool] for n in NUTRIENTS])
+        usable = np.isfinite(values).all(axis=1) & (values >= 0).all(axis=1) & (values[:, 0] > 0)
+        pool, values = pool[usable], values[usable]
+        if len(pool) < slots:
+            break
+        # Every (food, serving) candidate's nutrients, flattened to one axis
+        candidates = (values[:, None, :] * servings[None, :, None]).reshape(-1, len(NUTRIENTS))
+        food_of = np.repeat(np.arange(len(pool)), len(servings))
+        scaled = candidates / target
+        scaled_squares = (scaled ** 2 * two_sided).sum(axis=1)
+
+        choice = np.stack([rng.choice(len(pool), size=slots, replace=False) for _ in range(days)])
+        serving = rng.integers(len(servings), size=(days, slots))
+        contribution = candidates[choice * len(servings) + serving]         # (days, slots, NUTRIENTS)
+        totals = contribution.sum(axis=1)
+        meal_calories = contribution[..., 0].reshape(days, meals, foods_per_meal).sum(axis=2)
+        used = np.zeros((days, len(pool)), dtype=np.int64)                   # Slots using each food, per day
+        np.add.at(used, (np.repeat(day_index, slots), choice.ravel()), 1)
+
+        # Sweep the days still improving, until the budget is used up (but even a
+        # tiny budget gets the first restart's FIRST_SWEEPS sweeps)
+        active, sweeps = day_index, 0
+        while active.size and sweeps < MAX_SWEEPS and (
+                time.perf_counter() < deadline or (sweeps < FIRST_SWEEPS and np.isinf(best_error).all())):
+            moved = np.zeros(days, dtype=bool)
+            for slot in rng.permutation(slots).tolist():
+                meal = slot // foods_per_meal
+                current = contribution[active, slot]
+                used[active, choice[active, slot]] -= 1
+                # Relative error of every candidate's day: the square of (base + scaled)
+                # expanded, so the two-sided goals take one matrix product
+                base = (totals[active] - current) / target - 1
+                error = ((base ** 2 * two_sided).sum(axis=1)[:, None]
+                         + 2 * (base * two_sided) @ scaled.T + scaled_squares)
+                for i in np.flatnonzero(one_sided).tolist():
+                    error += one_sided[i] * np.minimum(base[:, i, None] + scaled[:, i], 0) ** 2
+                new_meal = (meal_calories[active, meal] - current[:, 0])[:, None] + candidates[:, 0]
+                error += MEAL_BALANCE * ((new_meal - meal_target) / meal_target) ** 2
+                error += REPEAT_PENALTY * (used.sum(axis=0) - used[active])[:, food_of]
+                error[used[active][:, food_of] > 0] = np.inf
+                pick = error.argmin(axis=1)
+
+                moved[active] |= pick != choice[active, slot] * len(servings) + serving[active, slot]
+                choice[active, slot], serving[active, slot] = food_of[pick], pick % len(servings)
+                contribution[active, slot] = candidates[pick]
+                totals[active] += candidates[pick] - current
+                meal_calories[active, meal] += candidates[pick, 0] - current[:, 0]
+                used[active, choice[active, slot]] += 1
+            active, sweeps = np.flatnonzero(moved), sweeps + 1
+
+        error = (_errors(totals, target, weights)
+                 + MEAL_BALANCE * (((meal_calories - meal_target) / meal_target) ** 2).sum(axis=1))
+        better = error < best_error
+        best_error[better] = error[better]
+        best_ids[better] = pool[choice[better]]
+        best_servings[better] = servings[serving[better]]
+        if time.perf_counter() >= deadline:
+            break
+
+    if np.isinf(best_error).any():
+        raise ValueError(f"The database has fewer than {slots} foods with usable nutrient values")
+    shape = (days, meals, foods_per_meal)
+    return MealPlan(database, best_ids.reshape(shape), best_servings.reshape(shape), goals)
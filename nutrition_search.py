@@ -0,0 +1,230 @@
+"""Typo-tolerant search over food names, for food databases with 500k+ items.
+
+``FoodSearchIndex`` is built once from the names (``st.cache_resource``
+shares it across sessions) and answers a query without scanning them:
+
+* A trigram index maps every 3-letter sequence of the lowercased names
+  (padded, so word starts count too) to the sorted ids of the names that
+  contain it, stored as one flat array plus offsets. A query counts the
+  trigrams each name shares with it in one ``bincount`` over its own
+  trigrams' lists (for trigrams in most names, like "bra" of "Brand", over
+  the shorter list of names lacking them). Names sharing half of them are
+  scored by trigram similarity (Dice coefficient), which survives typos
+  like "chiken brest".
+* A prefix index over the words of every name (sorted words, each with its
+  name ids) turns a query word into one contiguous slice of ids, so names
+  with a word starting with every query word rank first, even while the
+  last word is still being typed.
+
+Ties go to shorter names. Recent results are kept in a small LRU cache, as
+reruns repeat the same query.
+
+Fuzzy matching can miss a name that merely contains the query inside a word
+("an" in "Banana"), so ``contains_ids`` also gives the plain substring
+matches, for filters, from the same trigram index: the names with every
+trigram of the query (or, for one or two letters, with any trigram ending
+in them), checked against the names where that doesn't settle it.
+
+    python -m benchmarks.nutrition_search --foods 500000
+"""
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Without a prefix match, a name needs this share of the query's trigrams and this similarity
+MIN_COVERAGE = 0.5
+MIN_SIMILARITY = 0.3
+PREFIX_BONUS = 1.0
+
+# Letters and digits get their own code; everything else is a word break (0)
+_ALPHABET = 37
+_CODES = np.zeros(128, dtype=np.int64)
+_CODES[np.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)] = np.arange(1, 27)
+_CODES[np.frombuffer(b"0123456789", dtype=np.uint8)] = np.arange(27, 37)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase ASCII form of ``text`` (accents dropped) that the index compares"""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+
+def _encode(texts):
+    """Normalized ``texts`` joined with padding, its character codes, and the text of each character"""
+    padded = "".join(f"  {text} " for text in texts)
+    codes = _CODES[np.frombuffer(padded.encode("ascii"), dtype=np.uint8)]
+    owner = np.repeat(np.arange(len(texts), dtype=np.int64), [len(text) + 3 for text in texts])
+    return padded, codes, owner
+
+
+def _trigrams(codes, owner):
+    """(trigram codes, text index) of every trigram in encoded texts"""
+    grams = (codes[:-2] * _ALPHABET + codes[1:-1]) * _ALPHABET + codes[2:]
+    # Drop trigrams spanning two texts, and pure word breaks
+    keep = (owner[:-2] == owner[2:]) & (grams > 0)
+    return grams[keep], owner[:-2][keep]
+
+
+class FoodSearchIndex:
+    """Trigram and word-prefix index over a list of food names"""
+
+    def __init__(self, names, cache_size=256):
+        self.names = list(names)
+        size = len(self.names)
+        self.normalized = pd.Series([normalize(name) for name in self.names], dtype=str)
+        padded, codes, char_owner = _encode(self.normalized.tolist())
+
+        # Trigram -> ids of the names containing it (each name once)
+        grams, owner = _trigrams(codes, char_owner)
+        stride = max(size, 1)  # An empty index still gets (empty) arrays
+        pairs = np.sort(grams * stride + owner)
+        first = np.ones(pairs.size, dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        pairs = pairs[first]
+        self.gram_ids = (pairs % stride).astype(np.int32)
+        self.gram_offsets = np.searchsorted(pairs // stride, np.arange(_ALPHABET ** 3 + 1))
+        self.gram_counts = np.bincount(self.gram_ids, minlength=size)
+        # Trigrams in most names (like "bra" of "Brand") are counted by the names lacking them
+        self.gram_absent = {}
+        for gram in np.flatnonzero(np.diff(self.gram_offsets) > size // 2).tolist():
+            present = np.zeros(size, dtype=bool)
+            present[self.gram_ids[self.gram_offsets[gram]:self.gram_offsets[gram + 1]]] = True
+            self.gram_absent[gram] = np.flatnonzero(~present)
+
+        # Sorted distinct words, each with the ids of the names using it
+        in_word = codes > 0
+        starts = np.flatnonzero(in_word[1:] & ~in_word[:-1]) + 1
+        stops = np.flatnonzero(in_word[:-1] & ~in_word[1:]) + 1
+        found, uniques = pd.factorize(pd.Series([padded[a:b] for a, b in zip(starts.tolist(), stops.tolist())]))
+        alphabetical = np.argsort(uniques.to_numpy())
+        self.words = uniques[alphabetical].tolist()
+        word_codes = np.empty(alphabetical.size, dtype=np.int64)
+        word_codes[alphabetical] = np.arange(alphabetical.size)
+        word_codes = word_codes[found]
+        word_owner = char_owner[starts]
+        order = np.lexsort((word_owner, word_codes))
+        self.word_ids = word_owner[order].astype(np.int32)
+        self.word_offsets = np.searchsorted(word_codes[order], np.arange(len(self.words) + 1))
+
+        # Rank of every name among all names by (length, name), for ties
+        by_name = np.array(sorted(range(size), key=self.names.__getitem__), dtype=np.int64)
+        lengths = np.fromiter(map(len, self.names), dtype=np.int64, count=size)
+        self.rank = np.empty(size, dtype=np.int64)
+        self.rank[by_name[np.argsort(lengths[by_name], kind="stable")]] = np.arange(size)
+
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_matches(self, words):
+        """Boolean mask of the names with a word starting with each of ``words``"""
+        mask = None
+        for word in words:
+            lo = bisect.bisect_left(self.words, word)
+            hi = bisect.bisect_left(self.words, word + "\x7f", lo)
+            word_mask = np.zeros(len(self.names), dtype=bool)
+            word_mask[self.word_ids[self.word_offsets[lo]:self.word_offsets[hi]]] = True
+            mask = word_mask if mask is None else mask & word_mask
+        return mask
+
+    def _cached(self, key, compute):
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        ids = compute()
+        with self.lock:
+            self.cache[key] = ids
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return ids
+
+    def search_ids(self, query, limit=20):
+        """Ids of the names best matching ``query``, best first (all matches if ``limit`` is None)"""
+        return self._cached((query, limit), lambda: self._search(query, limit))
+
+    def contains_ids(self, query):
+        """Ids of the names containing ``query`` (compared normalized), ascending"""
+        return self._cached(("contains", query), lambda: self._contains(query))
+
+    def search(self, query, limit=20):
+        """Names best matching ``query``, best first (all matches if ``limit`` is None)"""
+        return [self.names[i] for i in self.search_ids(query, limit).tolist()]
+
+    def _contains(self, query):
+        text = normalize(query).strip()
+        if not text or not self.names:
+            return np.empty(0, dtype=np.int64)
+        codes = _CODES[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+        if not codes.any():
+            # Punctuation only: check every name
+            ids = np.arange(len(self.names))
+        elif len(text) < 3:
+            # Every character follows at least two others (names are padded), so
+            # a name contains the text when it has a trigram ending in it
+            tail = int(codes @ _ALPHABET ** np.arange(len(text) - 1, -1, -1))
+            found = np.zeros(len(self.names), dtype=bool)
+            for gram in range(tail, _ALPHABET ** 3, _ALPHABET ** len(text)):
+                found[self.gram_ids[self.gram_offsets[gram]:self.gram_offsets[gram + 1]]] = True
+            ids = np.flatnonzero(found)
+            if codes.all():
+                return ids
+        else:
+            grams = (codes[:-2] * _ALPHABET + codes[1:-1]) * _ALPHABET + codes[2:]
+            grams = np.unique(grams[grams > 0])  # Pure word breaks aren't indexed
+            # Names with every trigram of the query, shortest id list first
+            lists = sorted((self.gram_ids[self.gram_offsets[gram]:self.gram_offsets[gram + 1]]
+                            for gram in grams.tolist()), key=len)
+            ids = lists[0]
+            for other in lists[1:]:
+                ids = np.intersect1d(ids, other, assume_unique=True)
+        found = self.normalized.iloc[ids].str.contains(text, regex=False).to_numpy(dtype=bool)
+        return np.asarray(ids, dtype=np.int64)[found]
+
+    def _search(self, query, limit):
+        text = normalize(query).strip()
+        words = _WORD.findall(text)
+        if not words or not self.names:
+            return np.empty(0, dtype=np.int64)
+
+        grams = np.unique(_trigrams(*_encode([" ".join(words)])[1:])[0])
+        size = len(self.names)
+        need = max(1, math.ceil(MIN_COVERAGE * grams.size))
+        # Shared trigrams per name: one count over the id lists of the query's
+        # trigrams, where a trigram in most names counts as present minus the
+        # (shorter) list of names lacking it
+        present, absent = [], []
+        for gram in grams.tolist():
+            if gram in self.gram_absent:
+                absent.append(self.gram_absent[gram])
+            else:
+                present.append(self.gram_ids[self.gram_offsets[gram]:self.gram_offsets[gram + 1]])
+        shared = np.bincount(np.concatenate(present), minlength=size) if present else np.zeros(size, np.int64)
+        if absent:
+            shared += len(absent) - np.bincount(np.concatenate(absent), minlength=size)
+
+        prefix = self._prefix_matches(words)
+        candidates = np.flatnonzero((shared >= need) | prefix)
+        score = 2 * shared[candidates] / (grams.size + self.gram_counts[candidates])
+        is_prefix = prefix[candidates]
+        keep = is_prefix | (score >= MIN_SIMILARITY)
+        candidates, score = candidates[keep], score[keep] + PREFIX_BONUS * is_prefix[keep]
+
+        if limit is not None and candidates.size > limit:
+            # Everything scoring at least the limit-th best, so ties are cut by rank below
+            cutoff = np.partition(score, candidates.size - limit)[candidates.size - limit]
+            top = score >= cutoff
+            candidates, score = candidates[top], score[top]
+        order = np.lexsort((self.rank[candidates], -score))
+        return candidates[order][:limit]
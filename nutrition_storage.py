@@ -0,0 +1,334 @@
+"""Where the nutrition tracker keeps its data between sessions.
+
+A storage backend holds the food log plus small settings (the user profile
+and daily goals) and only ever hands out a date range of the log, so pages
+load what they show and startup cost doesn't grow with the history:
+
+* ``SQLiteStorage`` appends entries to a local database file (indexed by
+  profile and day) and survives page refreshes and restarts;
+* ``MemoryStorage`` keeps everything in the process, for tests and demos.
+
+Each backend object reads and writes one profile's data; ``with_profile``
+gives a view of another profile over the same database, so every user (the
+app keys them by the ``?profile=`` id in their page URL) has their own log,
+profile and goals.
+
+Any object with the same methods can be plugged in. ``StoredFoodLog`` puts
+the ``FoodLog`` API on top of a backend for one session, caching the few
+date ranges its pages asked for (today for the Dashboard, the picked range
+for Progress Analysis) and the per-day totals Progress Analysis charts,
+which ``SQLiteStorage`` keeps materialized in a table of its own updated by
+every write. Every backend counts each profile's writes in ``version``: a session
+patches its cached ranges and day totals after its own writes and reloads
+them when another session wrote in between. ``export_parquet`` writes any
+range to a Parquet file for analysis in other tools.
+"""
+import copy
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from nutrition_log import NUTRIENTS, DailyTotals, FoodLog
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nutrition.db")
+DEFAULT_PROFILE = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS food_log (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    day TEXT NOT NULL,
+    food TEXT NOT NULL,
+    calories REAL NOT NULL,
+    protein REAL NOT NULL,
+    carbs REAL NOT NULL,
+    fat REAL NOT NULL,
+    fiber REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS food_log_profile_day ON food_log (profile, day);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    profile TEXT NOT NULL,
+    day TEXT NOT NULL,
+    entries INTEGER NOT NULL,
+    calories REAL NOT NULL,
+    protein REAL NOT NULL,
+    carbs REAL NOT NULL,
+    fat REAL NOT NULL,
+    fiber REAL NOT NULL,
+    PRIMARY KEY (profile, day)
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+COLUMNS = ('profile', 'day', 'food') + NUTRIENTS
+_MATCH = " AND ".join(f"{column} = ?" for column in COLUMNS)
+# Re-sums the days matching a WHERE clause (bound as ?) into daily_totals
+_SUM_DAYS = (f"INSERT INTO daily_totals (profile, day, entries, {', '.join(NUTRIENTS)}) "
+             f"SELECT profile, day, COUNT(*), {', '.join(f'SUM({n})' for n in NUTRIENTS)} "
+             "FROM food_log WHERE {} GROUP BY profile, day")
+
+
+def _row(profile, entry):
+    return (profile, entry['date'].isoformat(), entry['food']) + tuple(entry.get(n, 0) for n in NUTRIENTS)
+
+
+class MemoryStorage:
+    """Everything in this process; gone when it exits"""
+
+    def __init__(self, profile=DEFAULT_PROFILE):
+        self.profile = profile
+        self.logs = {}       # profile -> FoodLog
+        self.settings = {}   # (profile, key) -> JSON value
+        self.versions = {}   # profile -> writes so far
+        self.lock = threading.Lock()
+
+    def with_profile(self, profile):
+        """This storage as seen by ``profile``: its own log and settings, the same process"""
+        view = copy.copy(self)
+        view.profile = profile
+        return view
+
+    @property
+    def log(self):
+        return self.logs.setdefault(self.profile, FoodLog())
+
+    @property
+    def version(self):
+        return self.versions.get(self.profile, 0)
+
+    def append(self, entry):
+        with self.lock:
+            self.log.append(entry)
+            self.versions[self.profile] = self.version + 1
+
+    def remove(self, entry):
+        with self.lock:
+            self.log.remove(entry)
+            self.versions[self.profile] = self.version + 1
+
+    def load(self, first, last):
+        """The entries from ``first`` to ``last`` (inclusive) as a FoodLog"""
+        with self.lock:
+            return FoodLog(self.log.entries(first, last))
+
+    def date_bounds(self):
+        """(first day, last day) of the whole log, or (None, None) when empty"""
+        return self.log.first_day(), self.log.last_day()
+
+    def daily_totals(self):
+        """DailyTotals of every logged day"""
+        with self.lock:
+            return self.log.daily_totals()
+
+    def get_setting(self, key, default=None):
+        # Stored as JSON like SQLiteStorage, so callers never share the objects
+        value = self.settings.get((self.profile, key))
+        return default if value is None else json.loads(value)
+
+    def set_setting(self, key, value):
+        self.settings[(self.profile, key)] = json.dumps(value)
+
+
+class SQLiteStorage:
+    """Food log and settings of every profile in a local SQLite file, seen as one profile.
+
+    ``with_profile`` gives another profile's view over the same connection,
+    so one instance per process can serve every session.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, profile=DEFAULT_PROFILE):
+        self.path = path
+        self.profile = profile
+        self.versions = {}  # profile -> writes so far, shared by every view
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        with self.connection:
+            # Databases from before daily_totals existed get it filled once
+            if (self.connection.execute("SELECT 1 FROM food_log LIMIT 1").fetchone()
+                    and not self.connection.execute("SELECT 1 FROM daily_totals LIMIT 1").fetchone()):
+                self.connection.execute(_SUM_DAYS.format("1"))
+
+    def with_profile(self, profile):
+        """This database as seen by ``profile``: same connection, that profile's log and settings"""
+        view = copy.copy(self)
+        view.profile = profile
+        return view
+
+    @property
+    def version(self):
+        return self.versions.get(self.profile, 0)
+
+    def _resum_day(self, day):
+        """Recompute ``day``'s row of daily_totals from its entries (no float drift from edits)"""
+        where = (self.profile, day.isoformat())
+        self.connection.execute("DELETE FROM daily_totals WHERE profile = ? AND day = ?", where)
+        self.connection.execute(_SUM_DAYS.format("profile = ? AND day = ?"), where)
+
+    def append(self, entry):
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"INSERT INTO food_log ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                _row(self.profile, entry))
+            self._resum_day(entry['date'])
+            self.versions[self.profile] = self.version + 1
+
+    def remove(self, entry):
+        """Delete one row equal to ``entry``; raises ValueError if there is none"""
+        with self.lock, self.connection:
+            deleted = self.connection.execute(
+                f"DELETE FROM food_log WHERE id = (SELECT id FROM food_log WHERE {_MATCH} LIMIT 1)",
+                _row(self.profile, entry)).rowcount
+            if not deleted:
+                raise ValueError(f"{entry['food']!r} is not logged on {entry['date']}")
+            self._resum_day(entry['date'])
+            self.versions[self.profile] = self.version + 1
+
+    def load(self, first, last):
+        """The entries from ``first`` to ``last`` (inclusive) as a FoodLog"""
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT day, food, {', '.join(NUTRIENTS)} FROM food_log "
+                "WHERE profile = ? AND day BETWEEN ? AND ? ORDER BY day, id",
+                (self.profile, first.isoformat(), last.isoformat())).fetchall()
+        return FoodLog({'date': date.fromisoformat(row[0]), 'food': row[1], **dict(zip(NUTRIENTS, row[2:]))}
+                       for row in rows)
+
+    def date_bounds(self):
+        """(first day, last day) of the whole log, or (None, None) when empty"""
+        with self.lock:
+            first, last = self.connection.execute(
+                "SELECT MIN(day), MAX(day) FROM food_log WHERE profile = ?", (self.profile,)).fetchone()
+        if first is None:
+            return None, None
+        return date.fromisoformat(first), date.fromisoformat(last)
+
+    def daily_totals(self):
+        """DailyTotals of every logged day, read from the materialized table"""
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT day, entries, {', '.join(NUTRIENTS)} FROM daily_totals "
+                "WHERE profile = ? ORDER BY day", (self.profile,)).fetchall()
+        return DailyTotals([row[0] for row in rows], [row[1] for row in rows], [row[2:] for row in rows])
+
+    def get_setting(self, key, default=None):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM settings WHERE key = ?",
+                                          (f"{self.profile}/{key}",)).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set_setting(self, key, value):
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                                    (f"{self.profile}/{key}", json.dumps(value)))
+
+    def close(self):
+        self.connection.close()
+
+
+def export_parquet(storage, target, first=None, last=None):
+    """Write the log from ``first`` to ``last`` (default all of it) to a Parquet file or buffer"""
+    bounds = storage.date_bounds()
+    first, last = first or bounds[0] or date.today(), last or bounds[1] or date.today()
+    storage.load(first, last).frame(foods=True).to_parquet(target, index=False)
+
+
+class StoredFoodLog:
+    """The FoodLog API over a storage backend, holding only the date ranges asked for"""
+
+    def __init__(self, storage, max_ranges=4):
+        self.storage = storage
+        self.max_ranges = max_ranges
+        self.ranges = OrderedDict()  # (first, last) -> FoodLog of that range, oldest use first
+        self.version = storage.version
+        self.bounds = None
+        self.daily = None  # DailyTotals of the whole log, loaded on first use
+
+    def _sync(self):
+        if self.version != self.storage.version:
+            self.ranges.clear()
+            self.bounds = None
+            self.daily = None
+            self.version = self.storage.version
+
+    def load(self, first, last):
+        """FoodLog of the entries from ``first`` to ``last``, from the cache if loaded before"""
+        self._sync()
+        key = (first, last)
+        log = self.ranges.get(key)
+        if log is None:
+            log = self.ranges[key] = self.storage.load(first, last)
+            if len(self.ranges) > self.max_ranges:
+                self.ranges.popitem(last=False)
+        else:
+            self.ranges.move_to_end(key)
+        return log
+
+    def append(self, entry):
+        self._sync()
+        self.storage.append(entry)
+        self._patch('append', entry)
+
+    def remove(self, entry):
+        self._sync()
+        self.storage.remove(entry)
+        self._patch('remove', entry)
+
+    def _patch(self, change, entry):
+        """Apply our own write to the cached ranges covering it, unless others wrote too"""
+        self.bounds = None
+        if self.storage.version != self.version + 1:
+            self._sync()
+            return
+        self.version += 1
+        day = entry['date']
+        for (first, last), log in self.ranges.items():
+            if first <= day <= last:
+                getattr(log, change)(entry)
+        if self.daily is not None:
+            getattr(self.daily, change)(entry)
+
+    def entries_on(self, day):
+        return self.load(day, day).entries_on(day)
+
+    def count_on(self, day):
+        return self.load(day, day).count_on(day)
+
+    def totals_on(self, day):
+        return self.load(day, day).totals_on(day)
+
+    def today(self):
+        """Today's totals and entries, as the Dashboard shows them"""
+        today = date.today()
+        return self.load(today, today).today()
+
+    def _bounds(self):
+        self._sync()
+        if self.bounds is None:
+            self.bounds = self.storage.date_bounds()
+        return self.bounds
+
+    def first_day(self):
+        return self._bounds()[0]
+
+    def last_day(self):
+        return self._bounds()[1]
+
+    def frame(self, first, last, foods=False):
+        """DataFrame of the entries from ``first`` to ``last``, loading only that range"""
+        return self.load(first, last).frame(foods=foods)
+
+    def daily_totals(self, first=None, last=None):
+        """DataFrame of the per-day totals from ``first`` to ``last``, sliced from the cached table"""
+        self._sync()
+        if self.daily is None:
+            self.daily = self.storage.daily_totals()
+        return self.daily.frame(first, last)
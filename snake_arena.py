@@ -0,0 +1,328 @@
+"""Many snakes on one shared board.
+
+``Arena`` applies the ``SnakeGame`` rules to every snake at once: a snake
+dies when its head leaves the board or enters an occupied cell (checked
+before any tail moves, as in single player), and two heads entering the
+same cell both die. Collisions are resolved with a shared spatial index,
+``owner``, holding the id of the snake on every cell (-1 when empty): one
+gather of the new head cells tells every snake what it hits, so a tick costs
+O(number of snakes) whatever their total length.
+
+``ArenaHost`` runs an arena on a background thread for the Streamlit app,
+keeping it topped up with bots that human players share the board with.
+
+    python -m benchmarks.snake_arena --snakes 500 --board-size 1000
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from snake_engine import (BODY, DIRECTION_CODES, EMPTY, FOOD, FOOD_POINTS, HEAD, _DX, _DY,
+                          _OPPOSITE_CODE)
+
+START_LENGTH = 3
+
+
+class Arena:
+    """Up to ``capacity`` snakes on one ``board_size`` board with shared food"""
+
+    def __init__(self, board_size=200, capacity=1024, food=None, seed=None):
+        self.board_size = board_size
+        self.n_cells = board_size * board_size
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        self.owner = np.full(self.n_cells, -1, dtype=np.int32)
+        self.food = np.zeros(self.n_cells, dtype=bool)
+        self.n_food = max(1, self.n_cells // 400) if food is None else food
+        self._claims = np.zeros(self.n_cells, dtype=np.int32)  # Scratch for head-on checks
+
+        self.bodies = [deque() for _ in range(capacity)]  # Flat cells, head first
+        self.heads = np.zeros(capacity, dtype=np.int64)
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.score = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)  # Slot in use
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free_ids = list(range(capacity - 1, -1, -1))
+        self._place_food(self.n_food)
+
+    # ------------------------------------------------------------------
+    # Snakes joining and leaving
+    # ------------------------------------------------------------------
+    def spawn(self, snake_id=None, attempts=100):
+        """Place a new snake (in slot ``snake_id`` or a free one) and return its id"""
+        if snake_id is None:
+            if not self.free_ids:
+                raise RuntimeError(f"Arena is full ({self.capacity} snakes)")
+            snake_id = self.free_ids.pop()
+        else:
+            self._clear(snake_id)
+            if snake_id in self.free_ids:
+                self.free_ids.remove(snake_id)
+        size = self.board_size
+        for _ in range(attempts):
+            # Head first, heading right with the body trailing to the left and
+            # a few free cells ahead
+            x = int(self.rng.integers(START_LENGTH - 1, size - START_LENGTH))
+            y = int(self.rng.integers(0, size))
+            cells = [y * size + x - i for i in range(-START_LENGTH, START_LENGTH)]
+            body = cells[START_LENGTH:]
+            if (self.owner[cells] < 0).all() and not self.food[body].any():
+                self.owner[body] = snake_id
+                self.bodies[snake_id] = deque(body)
+                self.heads[snake_id] = body[0]
+                self.direction[snake_id] = DIRECTION_CODES["RIGHT"]
+                self.score[snake_id] = 0
+                self.active[snake_id] = True
+                self.alive[snake_id] = True
+                return snake_id
+        self.active[snake_id] = False
+        if snake_id not in self.free_ids:
+            self.free_ids.append(snake_id)
+        raise RuntimeError("No room left to spawn a snake")
+
+    def remove(self, snake_id):
+        """Take a snake off the board and free its slot"""
+        if self.active[snake_id]:
+            self._clear(snake_id)
+            self.active[snake_id] = False
+            self.free_ids.append(snake_id)
+
+    def _clear(self, snake_id):
+        body = self.bodies[snake_id]
+        if self.alive[snake_id] and body:
+            self.owner[np.fromiter(body, dtype=np.int64, count=len(body))] = -1
+        self.alive[snake_id] = False
+        self.bodies[snake_id] = deque()
+
+    # ------------------------------------------------------------------
+    # Rules
+    # ------------------------------------------------------------------
+    def step(self, actions=None):
+        """Advance every live snake one tick; returns the ids of the snakes that died.
+
+        ``actions`` is an optional array of ``capacity`` direction codes, -1
+        to keep going; reversals are ignored, as in ``SnakeGame``.
+        """
+        ids = np.flatnonzero(self.alive)
+        if ids.size == 0:
+            return ids
+        direction = self.direction[ids]
+        if actions is not None:
+            wanted = np.asarray(actions, dtype=np.int8)[ids]
+            accept = (wanted >= 0) & (wanted != _OPPOSITE_CODE[direction])
+            direction = np.where(accept, wanted, direction)
+            self.direction[ids] = direction
+
+        size = self.board_size
+        head = self.heads[ids]
+        x = head % size + _DX[direction]
+        y = head // size + _DY[direction]
+        hit_wall = (x < 0) | (x >= size) | (y < 0) | (y >= size)
+        target = np.where(hit_wall, 0, y * size + x)
+
+        # Every collision in one lookup of the shared index, plus a scratch
+        # count of heads per target cell for head-on crashes
+        hit_body = (self.owner[target] >= 0) & ~hit_wall
+        claims = self._claims
+        np.add.at(claims, target[~hit_wall], 1)
+        head_on = (claims[target] > 1) & ~hit_wall
+        claims[target] = 0
+        dead = hit_wall | hit_body | head_on
+
+        for snake_id in ids[dead].tolist():
+            self._clear(snake_id)
+
+        movers, cells = ids[~dead], target[~dead]
+        self.owner[cells] = movers
+        self.heads[movers] = cells
+        ate = self.food[cells]
+        self.food[cells[ate]] = False
+        self.score[movers[ate]] += FOOD_POINTS
+
+        tails = []
+        bodies = self.bodies
+        for snake_id, cell, grew in zip(movers.tolist(), cells.tolist(), ate.tolist()):
+            body = bodies[snake_id]
+            body.appendleft(cell)
+            if not grew:
+                tails.append(body.pop())
+        if tails:
+            self.owner[tails] = -1
+        self._place_food(int(ate.sum()))
+        return ids[dead]
+
+    def _place_food(self, count):
+        """Drop ``count`` pieces of food on random empty cells"""
+        for _ in range(8):
+            if count <= 0:
+                return
+            cells = np.unique(self.rng.integers(0, self.n_cells, size=count))
+            cells = cells[(self.owner[cells] < 0) & ~self.food[cells]]
+            self.food[cells] = True
+            count -= cells.size
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+    def snake(self, snake_id):
+        """Body of one snake as a head-first list of (x, y) tuples"""
+        return [(cell % self.board_size, cell // self.board_size) for cell in self.bodies[snake_id]]
+
+    def board(self):
+        """Board as a (row, column) array of EMPTY/BODY/HEAD/FOOD values"""
+        board = np.where(self.owner >= 0, BODY, EMPTY).astype(np.uint8)
+        board[self.food] = FOOD
+        board[self.heads[self.alive]] = HEAD
+        return board.reshape(self.board_size, self.board_size)
+
+
+def bot_actions(arena, rng, turn_chance=0.05):
+    """Actions for every snake: keep going unless blocked, sometimes turning at random"""
+    actions = np.full(arena.capacity, -1, dtype=np.int8)
+    ids = np.flatnonzero(arena.alive)
+    if ids.size == 0:
+        return actions
+    size = arena.board_size
+    head = arena.heads[ids]
+    x = head[:, None] % size + _DX[None, :]
+    y = head[:, None] // size + _DY[None, :]
+    inside = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+    free = inside & (arena.owner[np.where(inside, y * size + x, 0)] < 0)
+    direction = arena.direction[ids]
+    free[np.arange(ids.size), _OPPOSITE_CODE[direction]] = False
+
+    ahead_free = free[np.arange(ids.size), direction]
+    turn = ~ahead_free | (rng.random(ids.size) < turn_chance)
+    # Random free direction (the weight is 0 for blocked ones)
+    choice = np.argmax(rng.random((ids.size, 4)) * free, axis=1).astype(np.int8)
+    can_turn = free.any(axis=1)
+    actions[ids] = np.where(turn & can_turn, choice, direction)
+    return actions
+
+
+class ArenaView:
+    """One player's view of the arena at a tick, shaped like a SnakeGame for renderers"""
+
+    image_only = True  # Many snakes and foods: renderers draw the board() image, never a keyframe
+
+    def __init__(self, board, score, length, game_over, players, tick):
+        self.board_size = board.shape[0]
+        self.cells = board
+        self.score = score
+        self.length = length
+        self.game_over = game_over
+        self.players = players
+        self.tick = tick
+
+    def board(self):
+        return self.cells
+
+    def drain_changes(self):
+        # Views carry no history, so renderers always redraw fully
+        return None
+
+
+class ArenaHost:
+    """Runs an Arena on a background thread, topped up with ``bots`` bot snakes"""
+
+    def __init__(self, board_size=200, bots=100, capacity=512, tick_interval=0.1,
+                 seed=None, idle_timeout=60):
+        self.arena = Arena(board_size, capacity=capacity, seed=seed)
+        self.rng = np.random.default_rng(seed)
+        self.bots = bots
+        self.bot_ids = set()
+        self.players = {}  # Snake id -> tick it was last viewed
+        self.pending = np.full(capacity, -1, dtype=np.int8)
+        self.tick_interval = tick_interval
+        self.idle_ticks = max(1, round(idle_timeout / tick_interval))
+        self.tick = 0
+        self.lock = threading.Lock()
+        self.running = False
+
+    def join(self):
+        """Spawn a player snake and return its id"""
+        with self.lock:
+            snake_id = self.arena.spawn()
+            self.players[snake_id] = self.tick
+            return snake_id
+
+    def restart(self, snake_id):
+        """Respawn a player's snake; raises KeyError once the player is gone"""
+        with self.lock:
+            if snake_id not in self.players:
+                raise KeyError(f"Snake {snake_id} is not in the arena")
+            try:
+                self.arena.spawn(snake_id)
+            except RuntimeError:
+                # The slot went back to the free ids, so the player is gone too
+                del self.players[snake_id]
+                raise
+            self.players[snake_id] = self.tick
+            self.pending[snake_id] = -1
+
+    def leave(self, snake_id):
+        with self.lock:
+            if self.players.pop(snake_id, None) is not None:
+                self.arena.remove(snake_id)
+
+    def send_input(self, snake_id, direction):
+        """Queue ``direction`` for the next tick"""
+        self.pending[snake_id] = DIRECTION_CODES[direction]
+
+    def view(self, snake_id):
+        """The board and this player's stats; raises KeyError once the player is gone"""
+        with self.lock:
+            if snake_id not in self.players:
+                raise KeyError(f"Snake {snake_id} is not in the arena")
+            self.players[snake_id] = self.tick
+            arena = self.arena
+            return ArenaView(arena.board(), int(arena.score[snake_id]), len(arena.bodies[snake_id]),
+                             not arena.alive[snake_id], len(self.players), self.tick)
+
+    def step(self):
+        with self.lock:
+            arena = self.arena
+            actions = bot_actions(arena, self.rng)
+            players = np.fromiter(self.players, dtype=np.int64, count=len(self.players))
+            actions[players] = self.pending[players]
+            self.pending[:] = -1
+            arena.step(actions)
+            self.tick += 1
+
+            # Dead bots make room for new ones; idle players are dropped
+            for snake_id in [i for i in self.bot_ids if not arena.alive[i]]:
+                arena.remove(snake_id)
+                self.bot_ids.discard(snake_id)
+            for snake_id, seen in list(self.players.items()):
+                if self.tick - seen > self.idle_ticks:
+                    del self.players[snake_id]
+                    arena.remove(snake_id)
+            while len(self.bot_ids) < self.bots and arena.free_ids:
+                try:
+                    self.bot_ids.add(arena.spawn())
+                except RuntimeError:
+                    break
+
+    def run(self):
+        """Tick at a fixed rate until ``stop`` is called"""
+        self.running = True
+        deadline = time.monotonic()
+        while self.running:
+            self.step()
+            deadline += self.tick_interval
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                deadline = time.monotonic()
+                delay = 0
+            time.sleep(delay)
+
+    def stop(self):
+        self.running = False
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.run, name="snake-arena", daemon=True)
+        thread.start()
+        return thread
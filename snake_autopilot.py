@@ -0,0 +1,195 @@
+"""Pathfinding autopilot for the snake.
+
+Each tick the autopilot picks a direction for a ``SnakeGame``:
+
+1. Follow the cached path to the food while it is still valid.
+2. Otherwise plan a shortest path to the food with BFS, aware of the cells
+   the tail frees as the snake moves, and only accept it if the snake could
+   still reach its own tail after eating (so it doesn't trap itself).
+3. Otherwise chase the tail the long way round, which keeps the snake
+   alive until the food becomes safe to reach.
+4. As a last resort follow a Hamiltonian cycle of the board (even sizes),
+   or the move with the most room left.
+
+Level walls (``SnakeGame.walls``) are never entered by any of the planners.
+"""
+from collections import deque
+
+from snake_engine import DIRECTIONS, OPPOSITE
+
+
+def hamiltonian_cycle(board_size):
+    """Map of cell -> next cell on a cycle through every cell, or None for odd sizes"""
+    if board_size % 2 or board_size < 2:
+        return None
+    # Row 0 left to right, zigzag over columns 1.. in the remaining rows,
+    # then back up column 0
+    order = [(x, 0) for x in range(board_size)]
+    for y in range(1, board_size):
+        xs = range(board_size - 1, 0, -1) if y % 2 else range(1, board_size)
+        order.extend((x, y) for x in xs)
+    order.extend((0, y) for y in range(board_size - 1, 0, -1))
+    return {cell: order[(i + 1) % len(order)] for i, cell in enumerate(order)}
+
+
+class Autopilot:
+    """Chooses moves for a SnakeGame, reusing its plan between ticks"""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+        self.cycle = None  # Built on first use; it is large on big boards
+        self.path = deque()
+        self.path_food = None
+        self.replans = 0
+        self.walls = None
+
+    def choose(self, game):
+        """Direction to take this tick"""
+        self.walls = game.walls
+        head = game.snake[0]
+        if self._path_valid(game, head):
+            return self._direction(head, self.path.popleft())
+
+        self.replans += 1
+        self.path = deque()
+        path = self._path_to_food(game)
+        if path:
+            self.path = deque(path)
+            self.path_food = game.food
+            return self._direction(head, self.path.popleft())
+
+        for planner in (self._chase_tail, self._follow_cycle, self._roomiest_move):
+            cell = planner(game)
+            if cell is not None:
+                return self._direction(head, cell)
+        return game.direction  # No safe move left
+
+    def _path_valid(self, game, head):
+        if not self.path or self.path_food != game.food:
+            return False
+        nxt = self.path[0]
+        return (abs(nxt[0] - head[0]) + abs(nxt[1] - head[1]) == 1
+                and not game.is_occupied(nxt))
+
+    @staticmethod
+    def _direction(head, cell):
+        delta = (cell[0] - head[0], cell[1] - head[1])
+        for name, step in DIRECTIONS.items():
+            if step == delta:
+                return name
+        raise ValueError(f"{cell} is not next to {head}")
+
+    def _neighbours(self, cell):
+        x, y = cell
+        size = self.board_size
+        walls = self.walls
+        index = y * size + x
+        if y > 0 and not walls[index - size]:
+            yield (x, y - 1)
+        if y < size - 1 and not walls[index + size]:
+            yield (x, y + 1)
+        if x > 0 and not walls[index - 1]:
+            yield (x - 1, y)
+        if x < size - 1 and not walls[index + 1]:
+            yield (x + 1, y)
+
+    def _bfs(self, snake, start, goal, growing=0):
+        """Shortest path (excluding ``start``) from start to goal, or None.
+
+        ``snake`` is the head-first body; a segment ``j`` places from the
+        tail is vacated after ``j + 1`` moves, so BFS may enter it from move
+        ``j + 2`` on (collisions are checked before the tail moves). While
+        ``growing`` the tail stays put.
+        """
+        length = len(snake)
+        release = {cell: length - i + 1 + growing for i, cell in enumerate(snake)}
+        parents = {start: None}
+        frontier = deque([(start, 0)])
+        while frontier:
+            cell, depth = frontier.popleft()
+            for nxt in self._neighbours(cell):
+                if nxt in parents:
+                    continue
+                if release.get(nxt, 0) > depth + 1:
+                    continue
+                parents[nxt] = cell
+                if nxt == goal:
+                    path = []
+                    while nxt != start:
+                        path.append(nxt)
+                        nxt = parents[nxt]
+                    return path[::-1]
+                frontier.append((nxt, depth + 1))
+        return None
+
+    def _path_to_food(self, game):
+        if game.food is None:
+            return None
+        snake = list(game.snake)
+        path = self._bfs(snake, snake[0], game.food)
+        if not path:
+            return None
+
+        # Virtual snake after following the path and eating the food
+        body = deque(snake)
+        for cell in path:
+            body.appendleft(cell)
+            if cell != game.food:
+                body.pop()
+        if len(body) == self.board_size * self.board_size - len(game.wall_cells):
+            return path
+        virtual = list(body)
+        if self._bfs(virtual, virtual[0], virtual[-1]) is None:
+            return None
+        return path
+
+    def _safe_moves(self, game):
+        head = game.snake[0]
+        back = DIRECTIONS[OPPOSITE[game.direction]]
+        for cell in self._neighbours(head):
+            if (cell[0] - head[0], cell[1] - head[1]) != back and not game.is_occupied(cell):
+                yield cell
+
+    def _chase_tail(self, game):
+        """Move that keeps the tail reachable, taking the longest way round"""
+        best, best_distance = None, -1
+        for cell in self._safe_moves(game):
+            body = deque(game.snake)
+            body.appendleft(cell)
+            if cell != game.food:
+                body.pop()
+            virtual = list(body)
+            path = self._bfs(virtual, cell, virtual[-1])
+            if path is not None and len(path) > best_distance:
+                best, best_distance = cell, len(path)
+        return best
+
+    def _follow_cycle(self, game):
+        if self.cycle is None:
+            self.cycle = hamiltonian_cycle(self.board_size)
+            if self.cycle is None:
+                return None
+        cell = self.cycle[game.snake[0]]
+        if cell in set(self._safe_moves(game)):
+            return cell
+        return None
+
+    def _roomiest_move(self, game):
+        best, best_room = None, -1
+        for cell in self._safe_moves(game):
+            room = self._room(game, cell)
+            if room > best_room:
+                best, best_room = cell, room
+        return best
+
+    def _room(self, game, start):
+        """Number of free cells reachable from ``start``"""
+        seen = {start}
+        frontier = [start]
+        while frontier:
+            cell = frontier.pop()
+            for nxt in self._neighbours(cell):
+                if nxt not in seen and not game.is_occupied(nxt):
+                    seen.add(nxt)
+                    frontier.append(nxt)
+        return len(seen)
@@ -0,0 +1,539 @@
+"""Headless snake game engine.
+
+The game rules live here so they can run without Streamlit: the web app in
+``02_snake_game.py`` keeps one ``SnakeGame`` in session state, while
+``BatchSnakeSimulator`` steps thousands of independent games per call with
+NumPy for load testing, AI evaluation and regression checks.
+"""
+import random
+from collections import deque
+
+import numpy as np
+
+# Game configuration
+BOARD_SIZE = 20
+BOARD_SIZES = (10, 20, 30, 50, 100, 200, 300, 500)  # The sizes the game offers (and replays may use)
+
+# Cell values used by SnakeGame.board()
+EMPTY, BODY, HEAD, FOOD, WALL = 0, 1, 2, 3, 4
+
+DIRECTIONS = {
+    "UP": (0, -1),
+    "DOWN": (0, 1),
+    "LEFT": (-1, 0),
+    "RIGHT": (1, 0),
+}
+
+OPPOSITE = {"UP": "DOWN", "DOWN": "UP", "LEFT": "RIGHT", "RIGHT": "LEFT"}
+
+# Compact direction codes (replays, rewind history and the batch simulator)
+DIRECTION_NAMES = ["UP", "DOWN", "LEFT", "RIGHT"]
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTION_NAMES)}
+
+FOOD_POINTS = 10
+
+
+def initial_snake(board_size):
+    """Starting body (head first) centred on the board"""
+    center = board_size // 2
+    return [(center, center), (center, center - 1), (center, center - 2)]
+
+
+class FreeCells:
+    """Set of free cell indices with O(1) add, remove and uniform sampling.
+
+    ``cells`` is a dense array of the free cells and ``position`` maps each
+    cell to its slot in ``cells`` (-1 when the cell is taken). Removal swaps
+    the last free cell into the vacated slot.
+    """
+
+    def __init__(self, n_cells):
+        self.cells = list(range(n_cells))
+        self.position = list(range(n_cells))
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return self.position[cell] >= 0
+
+    def remove(self, cell):
+        slot = self.position[cell]
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[slot] = last
+            self.position[last] = slot
+        self.position[cell] = -1
+
+    def add(self, cell, slot=None):
+        """Add ``cell`` at the end, or back into the ``slot`` it was removed from.
+
+        Undoing removals newest first with their old slots restores the
+        exact order of ``cells``, and with it the food sequence.
+        """
+        if slot is not None and slot < len(self.cells):
+            moved = self.cells[slot]
+            self.cells.append(moved)
+            self.position[moved] = len(self.cells) - 1
+            self.cells[slot] = cell
+            self.position[cell] = slot
+            return
+        self.position[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def sample(self, rng):
+        """Uniformly random free cell, or None when there is none"""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class RewindBuffer:
+    """The last ``capacity`` ticks of a SnakeGame as diffs, for ``SnakeGame.rewind``.
+
+    Each tick keeps the cell the head entered (with its slot in the free-cell
+    index), the tail cell it freed and the direction before the tick, in
+    fixed-size NumPy ring buffers, so memory stays at ~13 bytes per tick
+    however long the game runs. Ticks that eat also keep the RNG state from
+    before the new food was drawn (~2.5 kB each); the eaten food was on the
+    head cell.
+    """
+
+    DEATH = -1  # Head of a tick that ended the game without moving
+    ATE = -1    # Tail of a tick that ate (the tail stayed)
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.heads = np.zeros(capacity, dtype=np.int32)
+        self.slots = np.zeros(capacity, dtype=np.int32)
+        self.tails = np.zeros(capacity, dtype=np.int32)
+        self.directions = np.zeros(capacity, dtype=np.int8)
+        self.rng_states = {}  # Tick -> RNG state, for eating ticks only
+        self.clear("RIGHT")
+
+    def __len__(self):
+        return self.size
+
+    def clear(self, direction):
+        """Forget every tick; ``direction`` is the game's current heading"""
+        self.ticks = 0  # Ticks pushed so far (the next tick's number)
+        self.size = 0
+        self.direction = DIRECTION_CODES[direction]
+        self.rng_states.clear()
+
+    def push(self, head, slot, tail, direction, rng_state=None):
+        """Remember a tick that moved ``direction`` (overwrites the oldest when full)"""
+        i = self.ticks % self.capacity
+        if self.size == self.capacity:
+            self.rng_states.pop(self.ticks - self.capacity, None)
+        else:
+            self.size += 1
+        self.heads[i] = head
+        self.slots[i] = slot
+        self.tails[i] = tail
+        self.directions[i] = self.direction
+        self.direction = DIRECTION_CODES[direction]
+        if rng_state is not None:
+            version, internal, gauss = rng_state
+            self.rng_states[self.ticks] = (version, np.array(internal, dtype=np.uint32), gauss)
+        self.ticks += 1
+
+    def pop(self):
+        """Newest tick as (head, slot, tail, direction before it, rng state or None)"""
+        if not self.size:
+            raise IndexError("No ticks left to rewind")
+        self.ticks -= 1
+        self.size -= 1
+        i = self.ticks % self.capacity
+        self.direction = int(self.directions[i])
+        rng_state = self.rng_states.pop(self.ticks, None)
+        if rng_state is not None:
+            version, internal, gauss = rng_state
+            rng_state = (version, tuple(internal.tolist()), gauss)
+        return (int(self.heads[i]), int(self.slots[i]), int(self.tails[i]),
+                DIRECTION_NAMES[self.direction], rng_state)
+
+
+def start_rewind(game, capacity=1000):
+    """Keep the last ``capacity`` ticks of ``game`` so they can be rewound"""
+    game.history = RewindBuffer(capacity)
+    game.history.clear(game.direction)
+    return game.history
+
+
+class SnakeGame:
+    """State and rules of a single snake game.
+
+    The body is a deque (head first) mirrored by a flat occupancy grid, so
+    moving the head, dropping the tail and checking self collision are all
+    constant time regardless of the snake's length. A ``FreeCells`` index of
+    the remaining cells lets food spawn in O(1) however full the board is.
+
+    Pass ``seed`` for a reproducible game: every reset replays the same food
+    sequence for the same moves. ``walls`` is an optional collection of
+    ``(x, y)`` cells that block the snake (see ``snake_levels``).
+
+    Renderers can ask for the cells changed since their last frame with
+    ``drain_changes``; recording starts on the first call. An optional
+    ``recorder`` (see ``snake_replay.ReplayRecorder``) is told the direction
+    of every tick, and an optional ``history`` (a ``RewindBuffer``) keeps
+    recent ticks so they can be undone with ``rewind``.
+    """
+
+    def __init__(self, board_size=BOARD_SIZE, seed=None, recorder=None, walls=(), history=None):
+        self.board_size = board_size
+        self.seed = seed
+        self.recorder = recorder
+        self.history = history
+        self.walls = bytearray(board_size * board_size)
+        self.wall_cells = sorted({y * board_size + x for x, y in walls})
+        for index in self.wall_cells:
+            self.walls[index] = 1
+        self.reset()
+
+    def reset(self):
+        """Start a fresh game"""
+        self.rng = random.Random(self.seed)
+        self.set_body(initial_snake(self.board_size), "RIGHT")
+        self.score = 0
+        self.game_over = False
+        self.food = self.generate_food()
+
+    def set_body(self, cells, direction):
+        """Replace the snake with ``cells`` (head first) heading ``direction``"""
+        self.snake = deque(cells)
+        # Walls are permanently occupied, so one lookup covers every collision
+        self.occupied = bytearray(self.walls)
+        self.free = FreeCells(self.board_size * self.board_size)
+        for index in self.wall_cells:
+            self.free.remove(index)
+        for x, y in self.snake:
+            index = y * self.board_size + x
+            self.occupied[index] = 1
+            self.free.remove(index)
+        self.direction = direction
+        # Earlier deltas and rewind history no longer describe this board
+        self.changes = None
+        if self.history is not None:
+            self.history.clear(direction)
+
+    def snapshot(self):
+        """Everything needed to resume this game later with ``restore``"""
+        return (tuple(self.snake), self.direction, self.score, self.game_over,
+                self.food, self.rng.getstate(), tuple(self.free.cells))
+
+    def restore(self, snapshot):
+        """Resume from a ``snapshot``; later moves replay exactly as before"""
+        snake, direction, self.score, self.game_over, self.food, rng_state, free_cells = snapshot
+        self.set_body(snake, direction)
+        self.rng.setstate(rng_state)
+        # Food sampling depends on the order of the free cells, not just the set
+        self.free.cells = list(free_cells)
+        for slot, cell in enumerate(free_cells):
+            self.free.position[cell] = slot
+
+    def is_occupied(self, cell):
+        """True if the snake or a wall covers ``cell``"""
+        return self.occupied[cell[1] * self.board_size + cell[0]] == 1
+
+    def _occupy(self, index):
+        self.occupied[index] = 1
+        self.free.remove(index)
+
+    def _release(self, index, slot=None):
+        self.occupied[index] = 0
+        self.free.add(index, slot)
+
+    def generate_food(self):
+        """Random free cell for the next food, or None if the board is full"""
+        index = self.free.sample(self.rng)
+        if index is None:
+            return None
+        return (index % self.board_size, index // self.board_size)
+
+    def drain_changes(self):
+        """Cells changed since the last call as ``(x, y, value)`` tuples.
+
+        Returns None when no history is available (first call, or the body
+        was replaced since), in which case the caller should redraw fully.
+        """
+        changes = self.changes
+        self.changes = []
+        if changes is None:
+            return None
+        return changes
+
+    def turn(self, direction):
+        """Change direction unless it reverses the snake; returns True if accepted"""
+        if direction == OPPOSITE[self.direction]:
+            return False
+        self.direction = direction
+        return True
+
+    def apply_inputs(self, inputs):
+        """Play a batch of inputs in order; returns the number of moves made.
+
+        Each input is a direction to turn and move (ignored if it would
+        reverse the snake) or None to move straight on.
+        """
+        moves = 0
+        for direction in inputs:
+            if self.game_over:
+                break
+            if direction is None or self.turn(direction):
+                self.step()
+                moves += 1
+        return moves
+
+    def step(self):
+        """Advance the snake one cell in the current direction"""
+        if self.game_over:
+            return
+        if self.recorder is not None:
+            self.recorder.record(self.direction)
+
+        head = self.snake[0]
+        dx, dy = DIRECTIONS[self.direction]
+        new_head = (head[0] + dx, head[1] + dy)
+
+        # Check wall collision
+        if (new_head[0] < 0 or new_head[0] >= self.board_size or
+                new_head[1] < 0 or new_head[1] >= self.board_size):
+            self._die()
+            return
+
+        # Check self collision (and level walls)
+        index = new_head[1] * self.board_size + new_head[0]
+        if self.occupied[index]:
+            self._die()
+            return
+
+        # Add new head
+        self.snake.appendleft(new_head)
+        slot = self.free.position[index]
+        self._occupy(index)
+        if self.changes is not None:
+            self.changes.append((head[0], head[1], BODY))
+            self.changes.append((new_head[0], new_head[1], HEAD))
+
+        # Check if food is eaten
+        if new_head == self.food:
+            self.score += FOOD_POINTS
+            if self.history is not None:
+                self.history.push(index, slot, RewindBuffer.ATE, self.direction, self.rng.getstate())
+            self.food = self.generate_food()
+            if self.food is None:
+                # Board filled, nothing left to eat
+                self.game_over = True
+            elif self.changes is not None:
+                self.changes.append((self.food[0], self.food[1], FOOD))
+        else:
+            # Remove tail if no food eaten
+            tail = self.snake.pop()
+            tail_index = tail[1] * self.board_size + tail[0]
+            self._release(tail_index)
+            if self.history is not None:
+                self.history.push(index, slot, tail_index, self.direction)
+            if self.changes is not None:
+                self.changes.append((tail[0], tail[1], EMPTY))
+
+    def _die(self):
+        self.game_over = True
+        if self.history is not None:
+            self.history.push(RewindBuffer.DEATH, 0, 0, self.direction)
+
+    def rewind(self, ticks=1):
+        """Undo up to ``ticks`` of the most recent ticks kept in ``history``.
+
+        The board, score, food, direction and RNG end up exactly as they
+        were, so playing the same moves again gives the same game. Returns
+        the number of ticks undone.
+        """
+        undone = 0
+        size = self.board_size
+        while undone < ticks and self.history:
+            head, slot, tail, direction, rng_state = self.history.pop()
+            if self.recorder is not None:
+                self.recorder.undo()
+            self.direction = direction
+            self.game_over = False
+            undone += 1
+            if head == RewindBuffer.DEATH:
+                continue
+
+            cell = self.snake.popleft()
+            if tail == RewindBuffer.ATE:
+                # The food was where the head is now; draw the new food again later
+                if self.food is not None and self.changes is not None:
+                    self.changes.append((self.food[0], self.food[1], EMPTY))
+                self.food = cell
+                self.score -= FOOD_POINTS
+                self.rng.setstate(rng_state)
+                if self.changes is not None:
+                    self.changes.append((cell[0], cell[1], FOOD))
+            else:
+                tail_cell = (tail % size, tail // size)
+                self.snake.append(tail_cell)
+                self._occupy(tail)
+                if self.changes is not None:
+                    self.changes.append((cell[0], cell[1], EMPTY))
+                    self.changes.append((tail_cell[0], tail_cell[1], BODY))
+            self._release(head, slot)
+            if self.changes is not None:
+                neck = self.snake[0]
+                self.changes.append((neck[0], neck[1], HEAD))
+        return undone
+
+    def board(self):
+        """Board as a (row, column) array of EMPTY/BODY/HEAD/FOOD/WALL values"""
+        shape = (self.board_size, self.board_size)
+        occupied = np.frombuffer(self.occupied, dtype=np.uint8).reshape(shape)
+        walls = np.frombuffer(self.walls, dtype=np.uint8).reshape(shape)
+        board = np.where(walls, WALL, occupied * BODY)
+
+        if self.snake:
+            head = self.snake[0]
+            board[head[1], head[0]] = HEAD
+
+        if self.food is not None:
+            board[self.food[1], self.food[0]] = FOOD
+
+        return board
+
+
+_DX = np.array([DIRECTIONS[name][0] for name in DIRECTION_NAMES], dtype=np.int64)
+_DY = np.array([DIRECTIONS[name][1] for name in DIRECTION_NAMES], dtype=np.int64)
+_OPPOSITE_CODE = np.array([DIRECTION_CODES[OPPOSITE[name]] for name in DIRECTION_NAMES], dtype=np.int8)
+
+
+class BatchSnakeSimulator:
+    """Many independent snake games stepped together with NumPy.
+
+    Cells are flat indices ``y * board_size + x``. Each game's body is a ring
+    buffer of cells (tail at ``tail_ptr``, head at ``head_ptr``) next to a
+    boolean occupancy grid, so a step costs a handful of array operations for
+    the whole batch instead of a Python loop per game.
+    """
+
+    def __init__(self, n_games, board_size=BOARD_SIZE, seed=None):
+        self.n_games = n_games
+        self.board_size = board_size
+        self.n_cells = board_size * board_size
+        self.rng = np.random.default_rng(seed)
+
+        self.body = np.zeros((n_games, self.n_cells), dtype=np.int32)
+        self.occupied = np.zeros((n_games, self.n_cells), dtype=bool)
+        self.head_ptr = np.zeros(n_games, dtype=np.int64)
+        self.tail_ptr = np.zeros(n_games, dtype=np.int64)
+        self.length = np.zeros(n_games, dtype=np.int64)
+        self.direction = np.zeros(n_games, dtype=np.int8)
+        self.food = np.zeros(n_games, dtype=np.int64)
+        self.score = np.zeros(n_games, dtype=np.int64)
+        self.ticks = np.zeros(n_games, dtype=np.int64)
+        self.alive = np.zeros(n_games, dtype=bool)
+
+        self.reset()
+
+    def reset(self, games=None):
+        """Restart the given games (all of them by default)"""
+        if games is None:
+            games = np.arange(self.n_games)
+        games = np.asarray(games, dtype=np.int64)
+        if games.size == 0:
+            return
+
+        start = [y * self.board_size + x for x, y in reversed(initial_snake(self.board_size))]
+        self.occupied[games] = False
+        self.body[games, :len(start)] = start
+        self.occupied[games[:, None], np.array(start)] = True
+        self.tail_ptr[games] = 0
+        self.head_ptr[games] = len(start) - 1
+        self.length[games] = len(start)
+        self.direction[games] = DIRECTION_CODES["RIGHT"]
+        self.score[games] = 0
+        self.ticks[games] = 0
+        self.alive[games] = True
+        self._place_food(games)
+
+    def heads(self):
+        """Flat head cell of every game"""
+        return self.body[np.arange(self.n_games), self.head_ptr]
+
+    def snake(self, game):
+        """Body of one game as a head-first list of (x, y) tuples"""
+        slots = (self.tail_ptr[game] + np.arange(self.length[game])) % self.n_cells
+        cells = self.body[game, slots[::-1]].tolist()
+        return [(c % self.board_size, c // self.board_size) for c in cells]
+
+    def step(self, actions=None):
+        """Advance every live game one tick.
+
+        ``actions`` is an optional array of direction codes (see
+        ``DIRECTION_CODES``), with -1 for "keep going"; reversals are ignored
+        just like in ``SnakeGame``. Returns the number of games stepped: the
+        live games that moved plus those that died this tick.
+        """
+        games = np.flatnonzero(self.alive)
+        if games.size == 0:
+            return 0
+
+        direction = self.direction[games]
+        if actions is not None:
+            wanted = np.asarray(actions, dtype=np.int8)[games]
+            accept = (wanted >= 0) & (wanted != _OPPOSITE_CODE[direction])
+            direction = np.where(accept, wanted, direction)
+            self.direction[games] = direction
+
+        head = self.body[games, self.head_ptr[games]].astype(np.int64)
+        x = head % self.board_size + _DX[direction]
+        y = head // self.board_size + _DY[direction]
+
+        hit_wall = (x < 0) | (x >= self.board_size) | (y < 0) | (y >= self.board_size)
+        new_head = np.where(hit_wall, 0, y * self.board_size + x)
+        hit_self = self.occupied[games, new_head] & ~hit_wall
+        dead = hit_wall | hit_self
+        self.alive[games[dead]] = False
+
+        games = games[~dead]
+        new_head = new_head[~dead]
+        self.ticks[games] += 1
+
+        head_ptr = (self.head_ptr[games] + 1) % self.n_cells
+        self.head_ptr[games] = head_ptr
+        self.body[games, head_ptr] = new_head
+        self.occupied[games, new_head] = True
+
+        ate = new_head == self.food[games]
+        movers = games[~ate]
+        tail = self.body[movers, self.tail_ptr[movers]]
+        self.occupied[movers, tail] = False
+        self.tail_ptr[movers] = (self.tail_ptr[movers] + 1) % self.n_cells
+
+        eaters = games[ate]
+        if eaters.size:
+            self.length[eaters] += 1
+            self.score[eaters] += FOOD_POINTS
+            self._place_food(eaters)
+
+        return int(games.size + dead.sum())
+
+    def _place_food(self, games):
+        """Drop food on a random free cell for each of ``games``"""
+        pending = games
+        for _ in range(8):
+            cells = self.rng.integers(0, self.n_cells, size=pending.size)
+            free = ~self.occupied[pending, cells]
+            self.food[pending[free]] = cells[free]
+            pending = pending[~free]
+            if pending.size == 0:
+                return
+
+        # Nearly full boards: pick directly from the remaining free cells
+        for game in pending:
+            free_cells = np.flatnonzero(~self.occupied[game])
+            if free_cells.size == 0:
+                # Board filled, the game is won
+                self.food[game] = -1
+                self.alive[game] = False
+            else:
+                self.food[game] = self.rng.choice(free_cells)
@@ -0,0 +1,161 @@
+"""Persistent snake leaderboard in a local SQLite database.
+
+Finished games are handed to ``Leaderboard.submit``, which only queues them:
+a background writer thread commits the queue in batches (one transaction
+per batch), so the app never waits on the disk. The database runs in WAL
+mode, so reads never block on that writer and vice versa.
+
+Scores are only compared between games on the same board size and level,
+and both queries the app makes are served by an index:
+
+* top N for a board: ``(board_size, level, score DESC)``
+* a player's best on a board: ``(player, board_size, level, score DESC)``
+
+Query results are cached until the writer commits another batch. A batch
+that fails to write is dropped and counted in ``failed`` (the error is kept
+in ``last_error``), so one bad batch never stops the writer.
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from snake_levels import DEFAULT_LEVEL
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snake_scores.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    board_size INTEGER NOT NULL,
+    level TEXT NOT NULL,
+    seed INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_top ON games (board_size, level, score DESC);
+CREATE INDEX IF NOT EXISTS games_player ON games (player, board_size, level, score DESC);
+"""
+
+INSERT = ("INSERT INTO games (player, score, length, board_size, level, seed, played_at) "
+          "VALUES (?, ?, ?, ?, ?, ?, ?)")
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent with NORMAL; a crash can only lose the last batches
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class Leaderboard:
+    """Scores of finished games, written in the background and read from a cache"""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.version = 0  # Bumped after every committed batch
+        self.written = 0
+        self.failed = 0  # Rows of batches that could not be written
+        self.last_error = None
+        self.cache = {}
+        self.cache_version = 0
+        self.lock = threading.Lock()
+
+        self.reader = _connect(path)
+        self.reader.executescript(SCHEMA)
+        self.writer = threading.Thread(target=self._write_loop, name="snake-leaderboard", daemon=True)
+        self.writer.start()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def submit(self, player, game, played_at=None):
+        """Queue the result of a finished ``game``; returns immediately"""
+        self.queue.put((player, game.score, len(game.snake), game.board_size,
+                        getattr(game, "level", DEFAULT_LEVEL), game.seed,
+                        time.time() if played_at is None else played_at))
+
+    def submit_rows(self, rows):
+        """Queue pre-built rows (player, score, length, board_size, level, seed, played_at)"""
+        for row in rows:
+            self.queue.put(row)
+
+    def flush(self):
+        """Block until everything submitted so far is committed"""
+        self.queue.join()
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.writer.join()
+        self.reader.close()
+
+    def _write_loop(self):
+        connection = _connect(self.path)
+        while True:
+            batch = [self.queue.get()]
+            # Gather whatever else arrives within flush_interval, up to batch_size
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            try:
+                if rows:
+                    with connection:
+                        connection.executemany(INSERT, rows)
+                    with self.lock:
+                        self.version += 1
+                        self.written += len(rows)
+            except sqlite3.Error as error:
+                # A bad row, a locked or full database: drop the batch, keep the writer going
+                with self.lock:
+                    self.failed += len(rows)
+                    self.last_error = error
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if batch[-1] is None:
+                connection.close()
+                return
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def _query(self, key, sql, params):
+        with self.lock:
+            if self.cache_version != self.version:
+                self.cache = {}
+                self.cache_version = self.version
+            if key in self.cache:
+                return self.cache[key]
+            rows = self.reader.execute(sql, params).fetchall()
+            self.cache[key] = rows
+            return rows
+
+    def top(self, board_size, level=DEFAULT_LEVEL, n=10):
+        """Best ``n`` games on a board as (player, score, length, played_at) rows"""
+        return self._query(
+            ("top", board_size, level, n),
+            "SELECT player, score, length, played_at FROM games "
+            "WHERE board_size = ? AND level = ? ORDER BY score DESC LIMIT ?",
+            (board_size, level, n),
+        )
+
+    def personal_best(self, player, board_size, level=DEFAULT_LEVEL):
+        """``player``'s best score on a board, or 0 before their first game"""
+        rows = self._query(
+            ("best", player, board_size, level),
+            "SELECT MAX(score) FROM games WHERE player = ? AND board_size = ? AND level = ?",
+            (player, board_size, level),
+        )
+        return rows[0][0] or 0
@@ -0,0 +1,304 @@
+"""Level layouts with walls, and food that is always reachable.
+
+On a board with walls (and a long snake) some free cells can be cut off from
+the head, and food spawned there can never be eaten. ``LevelGame`` only
+places food in the connected region(s) of free cells next to the head.
+
+Flood-filling the board on every placement costs O(board area), so
+``Reachability`` keeps connected-component labels up to date as cells are
+occupied and released:
+
+* Releasing a cell (the tail moving on) can only merge regions, which is a
+  union-find union of the neighbouring labels.
+* Occupying a cell (the head moving in) can only split its region. If the
+  free cells around it are still connected through its 8 neighbours nothing
+  changes; otherwise small searches from each side run in lockstep until
+  they meet (no split) or one side runs out of cells (relabel just that
+  side). Only if the searches exceed ``search_budget`` cells is the whole
+  board relabelled, lazily on the next placement.
+
+Food is then sampled from the free-cell index and rejected if it lands in
+another region, with a vectorized scan of the labels as the fallback when
+the head's region is only a small part of the board.
+"""
+import random
+import heapq
+
+import numpy as np
+
+from snake_engine import BOARD_SIZE, SnakeGame
+
+LEVELS = ("open", "pillars", "rooms", "obstacles")
+DEFAULT_LEVEL = "open"
+OBSTACLE_DENSITY = 0.25
+
+# Ring of the 8 neighbours in order, flagging the 4 orthogonal ones
+_RING = [(0, -1, True), (1, -1, False), (1, 0, True), (1, 1, False),
+         (0, 1, True), (-1, 1, False), (-1, 0, True), (-1, -1, False)]
+
+
+def _start_area(board_size):
+    """Cells kept clear around the starting snake"""
+    centre = board_size // 2
+    return {(x, y) for x in range(centre - 4, centre + 5) for y in range(centre - 2, centre + 3)}
+
+
+def level_walls(level, board_size=BOARD_SIZE, seed=None):
+    """Wall cells ``(x, y)`` of ``level`` on a board of ``board_size``"""
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level {level!r}, expected one of {', '.join(LEVELS)}")
+    walls = set()
+    if level == "pillars":
+        # 2x2 pillars on a regular grid
+        for x in range(3, board_size - 4, 6):
+            for y in range(3, board_size - 4, 6):
+                walls.update({(x, y), (x + 1, y), (x, y + 1), (x + 1, y + 1)})
+    elif level == "rooms":
+        # Two walls across each axis, with a door in the middle of every segment
+        lines = (board_size // 4, board_size - 1 - board_size // 4)
+        bounds = (0,) + lines + (board_size,)
+        door = max(1, board_size // 10)
+        doors = set()
+        for low, high in zip(bounds, bounds[1:]):
+            middle = (low + high) // 2
+            doors.update(range(middle - door // 2, middle - door // 2 + door))
+        for line in lines:
+            for i in range(board_size):
+                if i not in doors:
+                    walls.update({(line, i), (i, line)})
+    elif level == "obstacles":
+        # Random single-cell obstacles, repeatable for a seeded game
+        rng = random.Random(seed)
+        walls = {(x, y) for y in range(board_size) for x in range(board_size)
+                 if rng.random() < OBSTACLE_DENSITY}
+    return sorted(walls - _start_area(board_size))
+
+
+class Reachability:
+    """Connected regions of the free cells of an occupancy grid"""
+
+    def __init__(self, occupied, board_size, search_budget=4096):
+        self.occupied = occupied  # Shared with the game, which keeps it current
+        self.board_size = board_size
+        self.search_budget = search_budget
+        self.labels = [-1] * (board_size * board_size)
+        self.parent = []
+        self.dirty = True
+        self.relabels = 0
+
+    def _find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def _new_label(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _free_neighbours(self, index):
+        size = self.board_size
+        x, y = index % size, index // size
+        occupied = self.occupied
+        if y > 0 and not occupied[index - size]:
+            yield index - size
+        if y < size - 1 and not occupied[index + size]:
+            yield index + size
+        if x > 0 and not occupied[index - 1]:
+            yield index - 1
+        if x < size - 1 and not occupied[index + 1]:
+            yield index + 1
+
+    def relabel(self):
+        """Label every region from scratch with a flood fill"""
+        self.relabels += 1
+        occupied = self.occupied
+        labels = self.labels = [-1] * len(occupied)
+        self.parent = []
+        for start in range(len(occupied)):
+            if occupied[start] or labels[start] >= 0:
+                continue
+            label = self._new_label()
+            labels[start] = label
+            stack = [start]
+            while stack:
+                for nxt in self._free_neighbours(stack.pop()):
+                    if labels[nxt] < 0:
+                        labels[nxt] = label
+                        stack.append(nxt)
+        self.dirty = False
+
+    def release(self, index):
+        """``index`` became free: join it to the regions around it"""
+        if self.dirty:
+            return
+        roots = {self._find(self.labels[nxt]) for nxt in self._free_neighbours(index)}
+        if not roots:
+            self.labels[index] = self._new_label()
+            return
+        root = roots.pop()
+        for other in roots:
+            self.parent[other] = root
+        self.labels[index] = root
+
+    def occupy(self, index):
+        """``index`` became occupied: split its region if it was a bottleneck"""
+        if self.dirty:
+            return
+        self.labels[index] = -1
+        sides = self._local_sides(index)
+        if len(sides) > 1:
+            self._split(sides)
+
+    def _local_sides(self, index):
+        """One free orthogonal neighbour per group connected around ``index``"""
+        size = self.board_size
+        x, y = index % size, index // size
+        free = []
+        for dx, dy, orthogonal in _RING:
+            nx, ny = x + dx, y + dy
+            inside = 0 <= nx < size and 0 <= ny < size
+            free.append((inside and not self.occupied[ny * size + nx], orthogonal, ny * size + nx))
+        # Start just after an occupied ring cell so runs don't wrap around
+        if all(cell_free for cell_free, _, _ in free):
+            return [free[0][2]]
+        start = next(i for i, (cell_free, _, _) in enumerate(free) if not cell_free)
+        sides = []
+        run_side = None
+        for i in range(1, 9):
+            cell_free, orthogonal, nxt = free[(start + i) % 8]
+            if not cell_free:
+                if run_side is not None:
+                    sides.append(run_side)
+                run_side = None
+            elif orthogonal and run_side is None:
+                run_side = nxt
+        return sides
+
+    def _split(self, sides):
+        """Search from each side in lockstep, relabelling any side that is cut off.
+
+        Each search is best-first towards the next side, so sides that are
+        still connected meet after going round the obstacle rather than
+        after flooding everything within that distance.
+        """
+        size = self.board_size
+        owner = {side: i for i, side in enumerate(sides)}
+        group = list(range(len(sides)))
+        frontiers = [[(0, side)] for side in sides]
+        targets = [divmod(sides[(i + 1) % len(sides)], size) for i in range(len(sides))]
+        cells = [[side] for side in sides]
+
+        def root(i):
+            while group[i] != i:
+                i = group[i]
+            return i
+
+        open_groups = set(range(len(sides)))
+        while len(open_groups) > 1:
+            if len(owner) > self.search_budget:
+                self.dirty = True
+                return
+            for i, frontier in enumerate(frontiers):
+                if not frontier or root(i) not in open_groups:
+                    continue
+                ty, tx = targets[i]
+                for nxt in self._free_neighbours(heapq.heappop(frontier)[1]):
+                    other = owner.get(nxt)
+                    if other is None:
+                        owner[nxt] = i
+                        ny, nx = divmod(nxt, size)
+                        heapq.heappush(frontier, (abs(ny - ty) + abs(nx - tx), nxt))
+                        cells[i].append(nxt)
+                    elif root(other) != root(i):
+                        gone = root(other)
+                        group[gone] = root(i)
+                        open_groups.discard(gone)
+                if frontier:
+                    continue
+                g = root(i)
+                members = [j for j in range(len(sides)) if root(j) == g]
+                if any(frontiers[j] for j in members):
+                    continue
+                # This side is a closed region of its own
+                open_groups.discard(g)
+                label = self._new_label()
+                for j in members:
+                    for cell in cells[j]:
+                        self.labels[cell] = label
+                if len(open_groups) < 2:
+                    return
+
+    def regions_near(self, index):
+        """Region roots of the free cells next to ``index``"""
+        if self.dirty:
+            self.relabel()
+        return {self._find(self.labels[nxt]) for nxt in self._free_neighbours(index)}
+
+    def region_mask(self, roots):
+        """Boolean mask of the cells in any of the regions ``roots``"""
+        parent = np.array(self.parent, dtype=np.int64)
+        # Point every label straight at its root
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        labels = np.array(self.labels, dtype=np.int64)
+        mask = labels >= 0
+        mask[mask] = np.isin(parent[labels[mask]], list(roots))
+        return mask
+
+
+class LevelGame(SnakeGame):
+    """A SnakeGame on a level layout whose food is always reachable from the head"""
+
+    sample_attempts = 16
+
+    def __init__(self, board_size=BOARD_SIZE, seed=None, recorder=None, level=DEFAULT_LEVEL):
+        self.level = level
+        super().__init__(board_size, seed=seed, recorder=recorder,
+                         walls=level_walls(level, board_size, seed))
+
+    def set_body(self, cells, direction):
+        super().set_body(cells, direction)
+        self.reach = Reachability(self.occupied, self.board_size)
+
+    def _occupy(self, index):
+        super()._occupy(index)
+        self.reach.occupy(index)
+
+    def _release(self, index, slot=None):
+        super()._release(index, slot)
+        self.reach.release(index)
+
+    def generate_food(self):
+        """Random free cell reachable from the head, or None if the board is full"""
+        if not self.free.cells:
+            return None
+        head = self.snake[0]
+        roots = self.reach.regions_near(head[1] * self.board_size + head[0])
+        index = None
+        if roots:
+            labels, find = self.reach.labels, self.reach._find
+            for _ in range(self.sample_attempts):
+                candidate = self.free.sample(self.rng)
+                if find(labels[candidate]) in roots:
+                    index = candidate
+                    break
+            else:
+                # The head's region is small: pick among its cells directly
+                cells = np.flatnonzero(self.reach.region_mask(roots))
+                index = int(cells[self.rng.randrange(len(cells))])
+        else:
+            # The head is boxed in; any free cell will do
+            index = self.free.sample(self.rng)
+        return (index % self.board_size, index // self.board_size)
+
+
+def make_game(board_size=BOARD_SIZE, seed=None, level=DEFAULT_LEVEL, recorder=None):
+    """A game on ``level``: a plain SnakeGame for the open board, else a LevelGame"""
+    if level == DEFAULT_LEVEL:
+        return SnakeGame(board_size, seed=seed, recorder=recorder)
+    return LevelGame(board_size, seed=seed, recorder=recorder, level=level)
@@ -0,0 +1,83 @@
+"""Opt-in per-rerun profiling for the snake app.
+
+Each script run (or fragment run) becomes one sample: the milliseconds spent
+in every named stage plus any extra values such as the board payload size.
+Samples live in a rolling window so the p50/p95 table reflects recent
+behaviour, and can be exported as CSV to compare builds.
+"""
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+
+class RerunProfiler:
+    """Times named stages of each rerun when ``enabled``"""
+
+    def __init__(self, window=500):
+        self.enabled = False
+        self.samples = deque(maxlen=window)
+        self.current = None
+
+    def start_run(self, kind):
+        """Begin a sample for a ``kind`` run ("full" or "fragment").
+
+        A sample left open by an interrupted run (st.rerun, st.stop) is dropped.
+        """
+        self.current = None
+        if self.enabled:
+            now = time.perf_counter()
+            self.current = {"run": kind, "timestamp": time.time(), "_start": now, "_lap": now}
+
+    def lap(self, name):
+        """Charge the time since the previous lap (or the start) to stage ``name``"""
+        if self.current is not None:
+            now = time.perf_counter()
+            elapsed = (now - self.current["_lap"]) * 1000
+            self.current[name] = self.current.get(name, 0.0) + elapsed
+            self.current["_lap"] = now
+
+    @contextmanager
+    def stage(self, name):
+        """Add the time spent in the ``with`` block to stage ``name`` (ms)"""
+        if self.current is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.current[name] = self.current.get(name, 0.0) + elapsed
+
+    def record(self, name, value):
+        """Attach a value (e.g. a payload size) to the current sample"""
+        if self.current is not None:
+            self.current[name] = value
+
+    def finish_run(self):
+        """Close the current sample and add it to the window"""
+        if self.current is None:
+            return
+        sample = self.current
+        del sample["_lap"]
+        sample["total"] = (time.perf_counter() - sample.pop("_start")) * 1000
+        self.samples.append(sample)
+        self.current = None
+
+    def frame(self):
+        """All samples in the window as a DataFrame"""
+        return pd.DataFrame(list(self.samples))
+
+    def summary(self):
+        """p50/p95/max per stage (ms) and payload size (bytes), by run kind"""
+        df = self.frame()
+        if df.empty:
+            return df
+        metrics = df.drop(columns=["timestamp"]).melt(id_vars="run", var_name="stage").dropna()
+        summary = metrics.groupby(["run", "stage"])["value"].describe(percentiles=[0.5, 0.95])
+        return summary[["count", "50%", "95%", "max"]].rename(columns={"50%": "p50", "95%": "p95"})
+
+    def to_csv(self):
+        return self.frame().to_csv(index=False)
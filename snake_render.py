@@ -0,0 +1,161 @@
+"""Delta-based canvas renderer for the snake board.
+
+Instead of regenerating an HTML grid on every rerun, the board is a custom
+Streamlit component that keeps its canvas between reruns. Each rerun sends
+only the cells that changed since the previous frame (new head, old head,
+removed tail, moved food), so the payload is O(changes) rather than
+O(board area). A full keyframe is sent for a new game or when the browser
+reports that it missed a frame.
+
+Boards larger than ``MAX_CANVAS_BOARD``, and views marked ``image_only``
+(like the arena's, which has many snakes), are sent as one palette-indexed PNG
+per frame instead (built from ``SnakeGame.board()`` with Pillow), which
+stays small even at 500x500. Encoded frames are kept in a process-wide LRU
+cache, so replays and repeated states are not re-encoded.
+
+The component also buffers WASD/space presses in the browser and sends them
+as one batch of ``[sequence, key, timestamp]`` events, which ``take_keys``
+turns into directions for ``SnakeGame.apply_inputs``.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+import numpy as np
+import streamlit as st
+import streamlit.components.v1 as components
+from PIL import Image
+
+MAX_BOARD_PIXELS = 600
+MAX_CANVAS_BOARD = 100
+MAX_BOARD_SIZE = 500  # The largest of snake_engine.BOARD_SIZES
+
+# Palette for EMPTY, BODY, HEAD, FOOD and WALL cells (same colours as the canvas)
+PALETTE = [0x33, 0x33, 0x33, 0x00, 0xff, 0x00, 0x00, 0x99, 0x00, 0xff, 0x00, 0x00, 0x88, 0x88, 0x88]
+
+# Key -> direction; None moves forward without turning
+KEY_DIRECTIONS = {"w": "UP", "a": "LEFT", "s": "DOWN", "d": "RIGHT", " ": None}
+
+_snake_board = components.declare_component(
+    "snake_board",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "snake_board"),
+)
+
+
+class FrameCache:
+    """Thread-safe LRU cache of encoded PNG frames keyed by board contents"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, board, scale):
+        """PNG bytes for ``board`` drawn ``scale`` pixels per cell"""
+        key = (hashlib.blake2b(board.tobytes(), digest_size=16).digest(), board.shape, scale)
+        with self.lock:
+            frame = self.frames.get(key)
+            if frame is not None:
+                self.frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            self.misses += 1
+        frame = encode_png(board, scale)
+        with self.lock:
+            self.frames[key] = frame
+            if len(self.frames) > self.maxsize:
+                self.frames.popitem(last=False)
+        return frame
+
+
+def encode_png(board, scale):
+    """Palette PNG of a board of EMPTY/BODY/HEAD/FOOD/WALL values"""
+    image = Image.fromarray(board.astype(np.uint8), mode="P")
+    image.putpalette(PALETTE)
+    if scale > 1:
+        image = image.resize((board.shape[1] * scale, board.shape[0] * scale), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+frame_cache = FrameCache()
+
+
+class CanvasRenderer:
+    """Per-session bookkeeping for the delta stream sent to the canvas"""
+
+    def __init__(self):
+        self.frame = 0
+        self.resync_seen = None
+        self.needs_keyframe = True
+        self.last_key_seq = 0
+
+    def take_keys(self, key="snake_board"):
+        """Directions for key presses not handled yet, oldest first.
+
+        Reads the component's current value from session state so keys are
+        applied before the board is drawn in the same run.
+        """
+        value = st.session_state.get(key) or {}
+        events = sorted(event for event in value.get("keys", []) if event[0] > self.last_key_seq)
+        if events:
+            self.last_key_seq = events[-1][0]
+        return [KEY_DIRECTIONS[event[1]] for event in events]
+
+    def payload(self, game, cell_size, capture_keys=False):
+        """Arguments for the next frame of ``game``"""
+        changes = game.drain_changes()
+        # Shrink cells so large boards still fit on the page
+        cell_size = max(2, min(cell_size, MAX_BOARD_PIXELS // game.board_size))
+        self.frame += 1
+        args = {
+            "frame": self.frame,
+            "size": game.board_size,
+            "cell_size": cell_size,
+            "image": None,
+            "keyframe": None,
+            "changes": [value for change in changes or () for value in change],
+            "ack": self.last_key_seq,
+            "capture_keys": capture_keys,
+        }
+        if game.board_size > MAX_CANVAS_BOARD or getattr(game, "image_only", False):
+            # Large board (or a view with no single snake): one image per frame;
+            # the next canvas frame starts over
+            scale = max(1, MAX_BOARD_PIXELS // game.board_size)
+            png = frame_cache.get(game.board(), scale)
+            args["image"] = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+            args["changes"] = []
+            self.needs_keyframe = True
+        elif changes is None or self.needs_keyframe:
+            args["keyframe"] = {
+                "snake": [value for segment in game.snake for value in segment],
+                "food": game.food,
+                "walls": [value for index in getattr(game, "wall_cells", ())
+                          for value in divmod(index, game.board_size)[::-1]],
+            }
+            args["changes"] = []
+            self.needs_keyframe = False
+        return args
+
+    def render(self, game, cell_size, key="snake_board", capture_keys=False, profiler=None):
+        """Draw ``game`` and handle resync requests from the browser"""
+        stage = profiler.stage if profiler is not None else lambda name: nullcontext()
+        with stage("payload"):
+            args = self.payload(game, cell_size, capture_keys)
+        if profiler is not None and profiler.enabled:
+            profiler.record("payload_bytes", len(json.dumps(args)))
+        with stage("component"):
+            value = _snake_board(**args, key=key, default=None)
+        if value and value.get("resync") != self.resync_seen:
+            # Setting the value already triggered a rerun, which sends the keyframe
+            self.resync_seen = value["resync"]
+            self.needs_keyframe = True
+        return value
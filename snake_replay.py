@@ -0,0 +1,142 @@
+"""Compact binary replays for snake games.
+
+A game is fully determined by its board size, seed, level and the direction
+of each tick, so a replay stores just that: a small header followed by 2 bits per
+tick (a 100k-tick game fits in 25 kB). ``Replay`` re-simulates with the
+headless engine and keeps a keyframe snapshot every ``keyframe_interval``
+ticks, so seeking anywhere in a long game only replays the ticks since the
+nearest keyframe. ``verify_score`` re-runs a submitted replay to check a
+claimed score.
+"""
+import struct
+
+from snake_engine import BOARD_SIZES, DIRECTION_CODES, DIRECTION_NAMES
+from snake_levels import DEFAULT_LEVEL, LEVELS, make_game
+
+MAGIC = b"SNK1"
+# magic, board size, seed, tick count, level (index into LEVELS)
+HEADER = struct.Struct("<4sHqIB")
+TICKS_PER_BYTE = 4
+MAX_SEED = 2**63  # Seeds are stored as a signed 64-bit integer
+
+# Byte value -> the four directions packed into it (lowest bits first)
+_UNPACK = [tuple(DIRECTION_NAMES[(byte >> (2 * i)) & 3] for i in range(TICKS_PER_BYTE))
+           for byte in range(256)]
+
+
+class ReplayRecorder:
+    """Collects the direction of every tick while a game is played"""
+
+    def __init__(self, board_size, seed, level=DEFAULT_LEVEL):
+        if not 0 <= seed < MAX_SEED:
+            raise ValueError(f"Seed must be between 0 and {MAX_SEED - 1} to be replayed")
+        self.board_size = board_size
+        self.seed = seed
+        self.level = level
+        self.ticks = 0
+        self.packed = bytearray()
+
+    def record(self, direction):
+        slot = self.ticks % TICKS_PER_BYTE
+        if slot == 0:
+            self.packed.append(0)
+        self.packed[-1] |= DIRECTION_CODES[direction] << (2 * slot)
+        self.ticks += 1
+
+    def undo(self):
+        """Forget the last recorded tick (the game was rewound)"""
+        self.ticks -= 1
+        byte, slot = divmod(self.ticks, TICKS_PER_BYTE)
+        if slot == 0:
+            self.packed.pop()
+        else:
+            self.packed[byte] &= (1 << (2 * slot)) - 1
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, self.board_size, self.seed, self.ticks, LEVELS.index(self.level))
+        return header + bytes(self.packed)
+
+
+class Replay:
+    """A decoded replay that can be re-simulated and seeked"""
+
+    def __init__(self, data, keyframe_interval=1000):
+        if len(data) < HEADER.size:
+            raise ValueError("Replay is too short")
+        magic, self.board_size, self.seed, self.ticks, level = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a snake replay")
+        if level >= len(LEVELS):
+            raise ValueError("Replay has an unknown level")
+        self.level = LEVELS[level]
+        if self.board_size not in BOARD_SIZES:
+            raise ValueError(f"Replay has an unsupported board size ({self.board_size})")
+        self.packed = bytes(data[HEADER.size:])
+        if len(self.packed) != -(-self.ticks // TICKS_PER_BYTE):
+            raise ValueError("Replay length does not match its tick count")
+        self.keyframe_interval = keyframe_interval
+        self.keyframes = None
+
+    def directions(self, start=0, stop=None):
+        """Directions of ticks ``start`` up to (not including) ``stop``"""
+        stop = self.ticks if stop is None else min(stop, self.ticks)
+        tick = start
+        while tick < stop:
+            byte, slot = divmod(tick, TICKS_PER_BYTE)
+            chunk = _UNPACK[self.packed[byte]][slot:TICKS_PER_BYTE]
+            for direction in chunk[:stop - tick]:
+                yield direction
+            tick += len(chunk)
+
+    def new_game(self):
+        """A fresh game with this replay's board size, seed and level"""
+        return make_game(self.board_size, seed=self.seed, level=self.level)
+
+    def _play(self, game, start, stop):
+        for direction in self.directions(start, stop):
+            game.direction = direction
+            game.step()
+
+    def simulate(self):
+        """Replay every tick from the start, without keeping keyframes"""
+        game = self.new_game()
+        self._play(game, 0, self.ticks)
+        return game
+
+    def build_keyframes(self):
+        """Simulate the whole game once, snapshotting every keyframe_interval ticks"""
+        game = self.new_game()
+        self.keyframes = [game.snapshot()]
+        for start in range(0, self.ticks, self.keyframe_interval):
+            self._play(game, start, start + self.keyframe_interval)
+            self.keyframes.append(game.snapshot())
+        return game
+
+    def game_at(self, tick):
+        """A SnakeGame positioned after ``tick`` ticks of the replay"""
+        if not 0 <= tick <= self.ticks:
+            raise ValueError(f"Tick must be between 0 and {self.ticks}")
+        if self.keyframes is None:
+            self.build_keyframes()
+        index = tick // self.keyframe_interval
+        game = self.new_game()
+        game.restore(self.keyframes[index])
+        self._play(game, index * self.keyframe_interval, tick)
+        return game
+
+
+def verify_score(data, claimed_score):
+    """True if re-simulating the replay ``data`` reaches ``claimed_score``"""
+    try:
+        replay = Replay(data)
+    except ValueError:
+        return False
+    return replay.simulate().score == claimed_score
+
+
+def start_recording(game):
+    """Attach a new recorder to ``game`` and return it"""
+    if game.seed is None:
+        raise ValueError("Only seeded games can be replayed")
+    game.recorder = ReplayRecorder(game.board_size, game.seed, getattr(game, "level", DEFAULT_LEVEL))
+    return game.recorder
@@ -0,0 +1,183 @@
+"""In-process snake game server.
+
+One asyncio tick loop advances every hosted game together through a
+``BatchSnakeSimulator``, so the cost of a tick is a few NumPy operations for
+all players instead of one Streamlit rerun per player. Each player (a
+Streamlit session or a simulated bot) joins to get a game slot, sends
+direction inputs that are applied on the next tick, and reads the state of
+its own game only.
+
+Streamlit apps share one server per process (``st.cache_resource``) and run
+its loop on a background thread with ``start_in_thread``. Asyncio clients
+such as the load generator in ``benchmarks/snake_load.py`` run it as a task
+and ``await server.wait_tick()``.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from snake_engine import BOARD_SIZE, DIRECTION_CODES, BatchSnakeSimulator
+
+DEFAULT_TICK_INTERVAL = 0.1
+
+
+class GameView:
+    """Read-only snapshot of one hosted game, shaped like a SnakeGame for renderers"""
+
+    def __init__(self, board_size, snake, food, score, game_over, tick):
+        self.board_size = board_size
+        self.snake = snake
+        self.food = food
+        self.score = score
+        self.game_over = game_over
+        self.tick = tick
+
+    def drain_changes(self):
+        # Snapshots carry no history, so renderers always redraw fully
+        return None
+
+
+class GameServer:
+    """Hosts up to ``capacity`` games advanced by one shared tick loop"""
+
+    def __init__(self, capacity=1024, board_size=BOARD_SIZE, tick_interval=DEFAULT_TICK_INTERVAL,
+                 seed=None, idle_timeout=None):
+        self.capacity = capacity
+        self.board_size = board_size
+        self.tick_interval = tick_interval
+        self.sim = BatchSnakeSimulator(capacity, board_size, seed=seed)
+        self.sim.alive[:] = False  # Slots start empty
+        self.active = np.zeros(capacity, dtype=bool)
+        self.pending = np.full(capacity, -1, dtype=np.int8)
+        # Games whose state isn't read for idle_timeout seconds are dropped,
+        # since browser sessions can disappear without calling leave()
+        self.idle_ticks = None if idle_timeout is None else max(1, round(idle_timeout / tick_interval))
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.lock = threading.Lock()
+
+        self.tick = 0
+        self.tick_seconds = deque(maxlen=1000)   # Time spent stepping each tick
+        self.tick_times = deque(maxlen=1000)     # When each tick finished
+        self.running = False
+        self._next_tick = None
+
+    # ------------------------------------------------------------------
+    # Player API (safe to call from any thread)
+    # ------------------------------------------------------------------
+    def join(self):
+        """Start a new game and return its id"""
+        with self.lock:
+            if not self.free_slots:
+                raise RuntimeError(f"Server is full ({self.capacity} games)")
+            game_id = self.free_slots.pop()
+            self.sim.reset([game_id])
+            self.active[game_id] = True
+            self.pending[game_id] = -1
+            self.last_seen[game_id] = self.tick
+        return game_id
+
+    def restart(self, game_id):
+        """Start over in the same slot"""
+        with self.lock:
+            self.sim.reset([game_id])
+            self.pending[game_id] = -1
+
+    def leave(self, game_id):
+        """Free the slot of a game that is no longer played"""
+        with self.lock:
+            self._release(game_id)
+
+    def _release(self, game_id):
+        if self.active[game_id]:
+            self.active[game_id] = False
+            self.sim.alive[game_id] = False
+            self.free_slots.append(game_id)
+
+    def send_input(self, game_id, direction):
+        """Queue ``direction`` for the next tick (the last input before a tick wins)"""
+        self.pending[game_id] = DIRECTION_CODES[direction]
+
+    def state(self, game_id):
+        """Current state of one game as a GameView"""
+        with self.lock:
+            if not self.active[game_id]:
+                raise KeyError(f"Game {game_id} is not running")
+            self.last_seen[game_id] = self.tick
+            sim = self.sim
+            food = int(sim.food[game_id])
+            return GameView(
+                self.board_size,
+                sim.snake(game_id),
+                None if food < 0 else (food % self.board_size, food // self.board_size),
+                int(sim.score[game_id]),
+                not sim.alive[game_id],
+                self.tick,
+            )
+
+    def stats(self):
+        """Active games, achieved ticks/sec and tick cost percentiles (ms)"""
+        with self.lock:
+            seconds = np.array(self.tick_seconds) * 1000
+            times = list(self.tick_times)
+        rate = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 else 0.0
+        return {
+            "active_games": int(self.active.sum()),
+            "ticks": self.tick,
+            "ticks_per_sec": rate,
+            "tick_ms_p50": float(np.percentile(seconds, 50)) if seconds.size else 0.0,
+            "tick_ms_p99": float(np.percentile(seconds, 99)) if seconds.size else 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Tick loop
+    # ------------------------------------------------------------------
+    def step(self):
+        """Apply pending inputs and advance every active game one tick"""
+        start = time.perf_counter()
+        with self.lock:
+            actions = self.pending.copy()
+            self.pending[:] = -1
+            self.sim.step(actions)
+            self.tick += 1
+            if self.idle_ticks is not None:
+                for game_id in np.flatnonzero(self.active & (self.tick - self.last_seen > self.idle_ticks)):
+                    self._release(int(game_id))
+            self.tick_seconds.append(time.perf_counter() - start)
+            self.tick_times.append(time.perf_counter())
+        return self.tick
+
+    async def wait_tick(self):
+        """Wait for the next tick and return its number"""
+        return await asyncio.shield(self._next_tick)
+
+    async def run(self):
+        """Tick at a fixed rate until ``stop`` is called"""
+        loop = asyncio.get_running_loop()
+        self.running = True
+        self._next_tick = loop.create_future()
+        deadline = loop.time()
+        while self.running:
+            tick = self.step()
+            waiter, self._next_tick = self._next_tick, loop.create_future()
+            waiter.set_result(tick)
+            # Schedule against a fixed timeline so slow ticks don't cause drift
+            deadline += self.tick_interval
+            delay = deadline - loop.time()
+            if delay < 0:
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def stop(self):
+        self.running = False
+
+    def start_in_thread(self):
+        """Run the tick loop on a daemon thread with its own event loop"""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="snake-server", daemon=True)
+        thread.start()
+        return thread
+
@@ -0,0 +1,113 @@
+"""Self-play tournament for snake policies.
+
+Plays the same seeded games with each policy on the headless engine, spread
+over a process pool, and reports score, length, survival and throughput.
+
+    python snake_tournament.py --policies straight greedy pathfinding --games 10000
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from snake_autopilot import Autopilot
+from snake_engine import DIRECTIONS, OPPOSITE, SnakeGame
+
+
+class StraightPolicy:
+    """Never turns, like auto-play without the autopilot"""
+
+    def __init__(self, board_size):
+        pass
+
+    def choose(self, game):
+        return game.direction
+
+
+class GreedyPolicy:
+    """Steps towards the food, avoiding moves that die immediately"""
+
+    def __init__(self, board_size):
+        self.board_size = board_size
+
+    def choose(self, game):
+        head = game.snake[0]
+        best, best_distance = game.direction, None
+        for direction, (dx, dy) in DIRECTIONS.items():
+            if direction == OPPOSITE[game.direction]:
+                continue
+            cell = (head[0] + dx, head[1] + dy)
+            if not (0 <= cell[0] < self.board_size and 0 <= cell[1] < self.board_size):
+                continue
+            if game.is_occupied(cell):
+                continue
+            distance = abs(cell[0] - game.food[0]) + abs(cell[1] - game.food[1]) if game.food else 0
+            if best_distance is None or distance < best_distance:
+                best, best_distance = direction, distance
+        return best
+
+
+POLICIES = {
+    "straight": StraightPolicy,
+    "greedy": GreedyPolicy,
+    "pathfinding": Autopilot,
+}
+
+
+def play_games(policy_name, board_size, seeds, max_ticks):
+    """Play one game per seed; returns rows of (score, length, ticks)"""
+    results = []
+    for seed in seeds:
+        game = SnakeGame(board_size, seed=seed)
+        policy = POLICIES[policy_name](board_size)
+        ticks = 0
+        while not game.game_over and ticks < max_ticks:
+            game.turn(policy.choose(game))
+            game.step()
+            ticks += 1
+        results.append((game.score, len(game.snake), ticks))
+    return results
+
+
+def run_policy(pool, policy_name, args):
+    """Play every seed with one policy; returns (results array, seconds)"""
+    seeds = range(args.seed, args.seed + args.games)
+    chunks = [seeds[i:i + args.chunk_size] for i in range(0, args.games, args.chunk_size)]
+    start = time.perf_counter()
+    futures = [pool.submit(play_games, policy_name, args.board_size, chunk, args.max_ticks)
+               for chunk in chunks]
+    results = [row for future in futures for row in future.result()]
+    return np.array(results, dtype=np.int64).reshape(-1, 3), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=sorted(POLICIES))
+    parser.add_argument("--games", type=int, default=1000, help="Games per policy")
+    parser.add_argument("--board-size", type=int, default=20)
+    parser.add_argument("--max-ticks", type=int, default=None,
+                        help="Stop a game after this many ticks (default: 25 per board cell)")
+    parser.add_argument("--seed", type=int, default=0, help="First seed; every policy plays the same seeds")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=50, help="Games per task sent to a worker")
+    args = parser.parse_args()
+    if args.max_ticks is None:
+        args.max_ticks = 25 * args.board_size * args.board_size
+
+    print(f"{args.games} games per policy on {args.board_size}x{args.board_size}, "
+          f"seeds {args.seed}..{args.seed + args.games - 1}")
+    print(f"{'policy':<12} {'avg score':>9} {'max':>6} {'avg len':>8} {'avg ticks':>10} "
+          f"{'capped':>7} {'games/s':>8} {'ticks/s':>10}")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for policy_name in args.policies:
+            results, seconds = run_policy(pool, policy_name, args)
+            score, length, ticks = results.T
+            capped = int((ticks >= args.max_ticks).sum())
+            print(f"{policy_name:<12} {score.mean():>9.1f} {score.max():>6} {length.mean():>8.1f} "
+                  f"{ticks.mean():>10.0f} {capped:>7} {len(results) / seconds:>8.1f} "
+                  f"{ticks.sum() / seconds:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()